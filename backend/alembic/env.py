@@ -61,6 +61,44 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def _bootstrap_fresh_database(connection) -> bool:
+    """
+    Fast path for empty databases (CI, new envs, docker compose up).
+
+    Instead of replaying the historical chain of CREATE TABLE + ADD COLUMN
+    + ALTER transactions, build the final schema directly from the models
+    metadata in one shot and stamp the head revision. Existing databases
+    (anything with an alembic_version or users table) are untouched and
+    keep upgrading through the individual revisions. PostgreSQL always
+    replays the chain, even when fresh: the migrations carry PG-only DDL
+    (partitioning, the LOWER(email) unique, GIN/INCLUDE indexes) that
+    metadata.create_all cannot reproduce.
+
+    Returns True if the fresh-install path was taken.
+    """
+    from sqlalchemy import inspect as sa_inspect
+    from alembic.script import ScriptDirectory
+
+    inspector = sa_inspect(connection)
+    fresh = not (inspector.has_table("alembic_version") or inspector.has_table("users"))
+
+    # The has_table probes autobegin a transaction (SQLAlchemy 2.0). Left
+    # open, alembic would treat the connection as externally managed and
+    # never commit — migrations would "run" and then silently roll back.
+    connection.rollback()
+
+    if not fresh or connection.dialect.name == "postgresql":
+        return False
+
+    target_metadata.create_all(bind=connection)
+
+    script = ScriptDirectory.from_config(config)
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.get_context().stamp(script, script.get_current_head())
+    return True
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
@@ -75,6 +113,10 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if _bootstrap_fresh_database(connection):
+            connection.commit()
+            return
+
         context.configure(
             connection=connection, target_metadata=target_metadata
         )
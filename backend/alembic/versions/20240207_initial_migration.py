@@ -19,6 +19,31 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+def _create_index(name: str, table: str, columns: list, unique: bool = False) -> None:
+    """
+    Create an index without blocking writes.
+    On PostgreSQL, plain CREATE INDEX takes an ACCESS EXCLUSIVE lock for the
+    duration of the build, so we emit CREATE INDEX CONCURRENTLY instead.
+    CONCURRENTLY cannot run inside a transaction, hence the autocommit_block.
+    On SQLite (dev default) there is no such lock problem, use the normal path.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        uniq = "UNIQUE " if unique else ""
+        cols = ", ".join(columns)
+        with op.get_context().autocommit_block():
+            op.execute(f"CREATE {uniq}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({cols})")
+    else:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def _drop_index(name: str, table: str) -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index(name, table_name=table)
+
+
 def upgrade() -> None:
     # --- Users ---
     op.create_table('users',
@@ -29,7 +54,7 @@ def upgrade() -> None:
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    _create_index('ix_users_email', 'users', ['email'], unique=True)
 
     # --- API Keys ---
     op.create_table('api_keys',
@@ -44,7 +69,7 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_api_keys_key_hash'), 'api_keys', ['key_hash'], unique=False)
+    _create_index('ix_api_keys_key_hash', 'api_keys', ['key_hash'])
 
     # --- Validation Result ---
     op.create_table('validation_result',
@@ -60,8 +85,8 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('plan_hash', 'engine_version', name='uq_plan_engine_version')
     )
-    op.create_index(op.f('ix_validation_result_engine_version'), 'validation_result', ['engine_version'], unique=False)
-    op.create_index(op.f('ix_validation_result_plan_hash'), 'validation_result', ['plan_hash'], unique=False)
+    _create_index('ix_validation_result_engine_version', 'validation_result', ['engine_version'])
+    _create_index('ix_validation_result_plan_hash', 'validation_result', ['plan_hash'])
 
     # --- Audit Log ---
     op.create_table('audit_log',
@@ -76,7 +101,7 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_audit_log_request_id'), 'audit_log', ['request_id'], unique=False)
+    _create_index('ix_audit_log_request_id', 'audit_log', ['request_id'])
 
     # --- AI Rate Limit Tracker ---
     op.create_table('ai_rate_limit_tracker',
@@ -94,12 +119,12 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     op.drop_table('ai_rate_limit_tracker')
-    op.drop_index(op.f('ix_audit_log_request_id'), table_name='audit_log')
+    _drop_index('ix_audit_log_request_id', 'audit_log')
     op.drop_table('audit_log')
-    op.drop_index(op.f('ix_validation_result_plan_hash'), table_name='validation_result')
-    op.drop_index(op.f('ix_validation_result_engine_version'), table_name='validation_result')
+    _drop_index('ix_validation_result_plan_hash', 'validation_result')
+    _drop_index('ix_validation_result_engine_version', 'validation_result')
     op.drop_table('validation_result')
-    op.drop_index(op.f('ix_api_keys_key_hash'), table_name='api_keys')
+    _drop_index('ix_api_keys_key_hash', 'api_keys')
     op.drop_table('api_keys')
-    op.drop_index(op.f('ix_users_email'), table_name='users')
+    _drop_index('ix_users_email', 'users')
     op.drop_table('users')
@@ -19,6 +19,29 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+def _create_index(name: str, table: str, columns: list, unique: bool = False) -> None:
+    """
+    Create an index without blocking writes (CREATE INDEX CONCURRENTLY on
+    PostgreSQL, plain create_index on SQLite). See 20240207_initial_migration.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        uniq = "UNIQUE " if unique else ""
+        cols = ", ".join(columns)
+        with op.get_context().autocommit_block():
+            op.execute(f"CREATE {uniq}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({cols})")
+    else:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def _drop_index(name: str, table: str) -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index(name, table_name=table)
+
+
+
 def upgrade() -> None:
     # Add email verification fields to users
     op.add_column('users', sa.Column('is_active', sa.Boolean(), nullable=False, server_default='0'))
@@ -36,11 +59,11 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_ai_suggestions_plan_hash'), 'ai_suggestions', ['plan_hash'], unique=False)
+    _create_index('ix_ai_suggestions_plan_hash', 'ai_suggestions', ['plan_hash'])
 
 
 def downgrade() -> None:
-    op.drop_index(op.f('ix_ai_suggestions_plan_hash'), table_name='ai_suggestions')
+    _drop_index('ix_ai_suggestions_plan_hash', 'ai_suggestions')
     op.drop_table('ai_suggestions')
     op.drop_column('users', 'email_verification_token')
     op.drop_column('users', 'is_active')
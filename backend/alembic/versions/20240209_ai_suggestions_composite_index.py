@@ -0,0 +1,49 @@
+"""Composite index for get_suggestions hot query
+
+Revision ID: d8e1f2a3b4c5
+Revises: 57390954ff52
+Create Date: 2024-02-09 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e1f2a3b4c5'
+down_revision: Union[str, None] = '57390954ff52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # get_suggestions filters by (user_id, plan_hash) and orders by
+    # created_at DESC. A composite index satisfies filter + ORDER BY in a
+    # single index scan instead of filter-then-sort over ix_ai_suggestions_plan_hash.
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ai_suggestions_user_plan_created "
+                "ON ai_suggestions (user_id, plan_hash, created_at DESC)"
+            )
+            # Superseded for the only query that used it (user_id + plan_hash filter)
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_ai_suggestions_plan_hash")
+    else:
+        op.create_index(
+            'ix_ai_suggestions_user_plan_created',
+            'ai_suggestions',
+            ['user_id', 'plan_hash', sa.text('created_at DESC')],
+        )
+        op.drop_index('ix_ai_suggestions_plan_hash', table_name='ai_suggestions')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ai_suggestions_plan_hash ON ai_suggestions (plan_hash)")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_ai_suggestions_user_plan_created")
+    else:
+        op.create_index('ix_ai_suggestions_plan_hash', 'ai_suggestions', ['plan_hash'])
+        op.drop_index('ix_ai_suggestions_user_plan_created', table_name='ai_suggestions')
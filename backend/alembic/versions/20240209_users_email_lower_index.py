@@ -0,0 +1,42 @@
+"""Case-insensitive unique index on users.email
+
+Revision ID: e9f0a1b2c3d4
+Revises: d8e1f2a3b4c5
+Create Date: 2024-02-09 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9f0a1b2c3d4'
+down_revision: Union[str, None] = 'd8e1f2a3b4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Emails are case-insensitive in practice; the plain btree on email let
+    # "Foo@x" and "foo@x" coexist and forced exact-case lookups. A
+    # LOWER(email) functional unique index enforces uniqueness
+    # case-insensitively and serves the lowered-equality lookups in auth.py.
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_lower ON users (LOWER(email))")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email")
+    else:
+        op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email_lower ON users (LOWER(email))")
+        op.drop_index('ix_users_email', table_name='users')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email ON users (email)")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_lower")
+    else:
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+        op.execute("DROP INDEX IF EXISTS ix_users_email_lower")
@@ -0,0 +1,41 @@
+"""Store ai_suggestions.suggestion_json as JSONB
+
+Revision ID: f1a2b3c4d5e6
+Revises: e9f0a1b2c3d4
+Create Date: 2024-02-10 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a2b3c4d5e6'
+down_revision: Union[str, None] = 'e9f0a1b2c3d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # JSONB stores the parsed form, so reads skip the Python json.loads
+    # round trip and future queries can index into the document.
+    # SQLite keeps TEXT storage; SQLAlchemy's JSON type handles the
+    # (de)serialization there, so no DDL is needed.
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            'ai_suggestions', 'suggestion_json',
+            type_=postgresql.JSONB(astext_type=sa.Text()),
+            postgresql_using='suggestion_json::jsonb',
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            'ai_suggestions', 'suggestion_json',
+            type_=sa.Text(),
+            postgresql_using='suggestion_json::text',
+        )
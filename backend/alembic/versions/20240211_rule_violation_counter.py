@@ -0,0 +1,36 @@
+"""Rollup table for per-user rule violation counts
+
+Revision ID: a7b8c9d0e1f2
+Revises: f1a2b3c4d5e6
+Create Date: 2024-02-11 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, None] = 'f1a2b3c4d5e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Maintained incrementally by validate_plan so /stats no longer scans
+    # and re-parses the last 50 DFR payloads per request.
+    op.create_table(
+        'rule_violation_counter',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('rule_id', sa.String(64), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.UniqueConstraint('user_id', 'rule_id', name='uq_rule_counter_user_rule'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rule_violation_counter')
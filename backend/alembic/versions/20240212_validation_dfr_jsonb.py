@@ -0,0 +1,49 @@
+"""Store validation_result.dfr_json as JSONB
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2024-02-12 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # JSONB stores the parsed form, so cache hits and the stats fallback
+    # skip the Python json.loads round trip, and Postgres can aggregate
+    # rule_ids server-side with its jsonb_* operators.
+    # SQLite keeps TEXT storage; SQLAlchemy's JSON type handles the
+    # (de)serialization there, so no DDL is needed.
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            'validation_result', 'dfr_json',
+            type_=postgresql.JSONB(astext_type=sa.Text()),
+            postgresql_using='dfr_json::jsonb',
+        )
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_validation_result_dfr_json "
+                "ON validation_result USING GIN (dfr_json)"
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_validation_result_dfr_json")
+        op.alter_column(
+            'validation_result', 'dfr_json',
+            type_=sa.Text(),
+            postgresql_using='dfr_json::text',
+        )
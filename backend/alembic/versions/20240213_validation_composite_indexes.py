@@ -0,0 +1,67 @@
+"""Composite indexes for validation_result hot queries
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2024-02-13 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The hot predicates are (user_id, created_at DESC) for the recent
+    # list and (user_id, passed, created_at DESC) for the failed-scan
+    # fallback; INCLUDE lets Postgres answer the latter with an
+    # index-only scan. The cache lookup on (plan_hash, engine_version)
+    # is already served by uq_plan_engine_version's backing index, so
+    # the solo single-column indexes are dropped.
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vr_user_created "
+                "ON validation_result (user_id, created_at DESC)"
+            )
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vr_user_passed_created "
+                "ON validation_result (user_id, passed, created_at DESC) "
+                "INCLUDE (id, plan_hash)"
+            )
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_validation_result_plan_hash")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_validation_result_engine_version")
+    else:
+        op.create_index(
+            'ix_vr_user_created',
+            'validation_result',
+            ['user_id', sa.text('created_at DESC')],
+        )
+        op.create_index(
+            'ix_vr_user_passed_created',
+            'validation_result',
+            ['user_id', 'passed', sa.text('created_at DESC')],
+        )
+        op.drop_index('ix_validation_result_plan_hash', table_name='validation_result')
+        op.drop_index('ix_validation_result_engine_version', table_name='validation_result')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_validation_result_plan_hash ON validation_result (plan_hash)")
+            op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_validation_result_engine_version ON validation_result (engine_version)")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_vr_user_passed_created")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_vr_user_created")
+    else:
+        op.create_index('ix_validation_result_plan_hash', 'validation_result', ['plan_hash'])
+        op.create_index('ix_validation_result_engine_version', 'validation_result', ['engine_version'])
+        op.drop_index('ix_vr_user_passed_created', table_name='validation_result')
+        op.drop_index('ix_vr_user_created', table_name='validation_result')
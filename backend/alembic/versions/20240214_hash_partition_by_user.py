@@ -0,0 +1,146 @@
+"""Hash-partition validation_result and audit_log by user_id (PostgreSQL)
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2024-02-14 09:00:00.000000
+
+PostgreSQL cannot convert an existing table to a partitioned one in
+place, so both tables are rebuilt: create the partitioned parent with 16
+hash partitions, copy the rows, drop the old table and take its name.
+This rewrites the tables — run it in a maintenance window on large
+installs. The models stay unpartitioned-agnostic on purpose: declaring
+postgresql_partition_by there would break metadata.create_all on SQLite
+and the fresh-database bootstrap.
+
+The idempotency unique constraint widens to (user_id, plan_hash,
+engine_version) because a partitioned unique index must contain the
+partition key. Cross-user cache hits stay correct: plan_hash is a pure
+content hash, so the lookup by (plan_hash, engine_version) returns an
+equivalent row whichever user wrote it.
+
+No-op on SQLite.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_N_PARTITIONS = 16
+
+
+def _create_partitions(table: str) -> None:
+    for i in range(_N_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE {table}_p{i} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {_N_PARTITIONS}, REMAINDER {i})"
+        )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # ── validation_result ──
+    op.execute("ALTER TABLE validation_result RENAME TO validation_result_unpart")
+    op.execute("""
+        CREATE TABLE validation_result (
+            id UUID NOT NULL,
+            user_id UUID NOT NULL REFERENCES users (id),
+            plan_hash VARCHAR(64) NOT NULL,
+            engine_version VARCHAR(64) NOT NULL,
+            schema_version VARCHAR(16) NOT NULL,
+            canonical_plan_json TEXT NOT NULL,
+            dfr_json JSONB NOT NULL,
+            passed BOOLEAN NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            PRIMARY KEY (id, user_id),
+            CONSTRAINT uq_plan_engine_version UNIQUE (user_id, plan_hash, engine_version)
+        ) PARTITION BY HASH (user_id)
+    """)
+    _create_partitions("validation_result")
+    op.execute("INSERT INTO validation_result SELECT * FROM validation_result_unpart")
+    op.execute("DROP TABLE validation_result_unpart")
+    # Parent-level indexes cascade to every partition
+    op.execute("CREATE INDEX ix_vr_user_created ON validation_result (user_id, created_at DESC)")
+    op.execute(
+        "CREATE INDEX ix_vr_user_passed_created ON validation_result "
+        "(user_id, passed, created_at DESC) INCLUDE (id, plan_hash)"
+    )
+    op.execute("CREATE INDEX ix_validation_result_dfr_json ON validation_result USING GIN (dfr_json)")
+    # The idempotency lookup filters by (plan_hash, engine_version) alone;
+    # the widened unique above leads with user_id, so without this the
+    # lookup would scan all 16 partitions.
+    op.execute("CREATE INDEX ix_vr_plan_engine ON validation_result (plan_hash, engine_version)")
+
+    # ── audit_log ──
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_unpart")
+    op.execute("""
+        CREATE TABLE audit_log (
+            id UUID NOT NULL,
+            request_id UUID NOT NULL,
+            user_id UUID NOT NULL REFERENCES users (id),
+            action VARCHAR NOT NULL,
+            action_type VARCHAR NOT NULL,
+            status VARCHAR NOT NULL,
+            violations_count INTEGER,
+            timestamp TIMESTAMP WITHOUT TIME ZONE,
+            PRIMARY KEY (id, user_id)
+        ) PARTITION BY HASH (user_id)
+    """)
+    _create_partitions("audit_log")
+    op.execute("INSERT INTO audit_log SELECT * FROM audit_log_unpart")
+    op.execute("DROP TABLE audit_log_unpart")
+    op.execute("CREATE INDEX ix_audit_log_request_id ON audit_log (request_id)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE validation_result RENAME TO validation_result_part")
+    op.execute("""
+        CREATE TABLE validation_result (
+            id UUID NOT NULL PRIMARY KEY,
+            user_id UUID NOT NULL REFERENCES users (id),
+            plan_hash VARCHAR(64) NOT NULL,
+            engine_version VARCHAR(64) NOT NULL,
+            schema_version VARCHAR(16) NOT NULL,
+            canonical_plan_json TEXT NOT NULL,
+            dfr_json JSONB NOT NULL,
+            passed BOOLEAN NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT uq_plan_engine_version UNIQUE (plan_hash, engine_version)
+        )
+    """)
+    op.execute("INSERT INTO validation_result SELECT * FROM validation_result_part")
+    op.execute("DROP TABLE validation_result_part")
+    op.execute("CREATE INDEX ix_vr_user_created ON validation_result (user_id, created_at DESC)")
+    op.execute(
+        "CREATE INDEX ix_vr_user_passed_created ON validation_result "
+        "(user_id, passed, created_at DESC) INCLUDE (id, plan_hash)"
+    )
+    op.execute("CREATE INDEX ix_validation_result_dfr_json ON validation_result USING GIN (dfr_json)")
+
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_part")
+    op.execute("""
+        CREATE TABLE audit_log (
+            id UUID NOT NULL PRIMARY KEY,
+            request_id UUID NOT NULL,
+            user_id UUID NOT NULL REFERENCES users (id),
+            action VARCHAR NOT NULL,
+            action_type VARCHAR NOT NULL,
+            status VARCHAR NOT NULL,
+            violations_count INTEGER,
+            timestamp TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    op.execute("INSERT INTO audit_log SELECT * FROM audit_log_part")
+    op.execute("DROP TABLE audit_log_part")
+    op.execute("CREATE INDEX ix_audit_log_request_id ON audit_log (request_id)")
@@ -0,0 +1,51 @@
+"""Add rule_ids array column to validation_result
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2024-02-15 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f2a3b4c5d6'
+down_revision: Union[str, None] = 'd0e1f2a3b4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Struct-of-arrays companion to dfr_json: aggregation paths read the
+    # compact id array instead of the full violation documents. Nullable —
+    # readers fall back to dfr_json for rows that predate the column.
+    if op.get_bind().dialect.name == "postgresql":
+        op.add_column(
+            'validation_result',
+            sa.Column('rule_ids', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        )
+        # Backfill from the stored documents so the stats fallback never
+        # has to touch dfr_json again on PG.
+        op.execute(
+            "UPDATE validation_result SET rule_ids = "
+            "(SELECT COALESCE(jsonb_agg(v->>'rule_id'), '[]'::jsonb) "
+            " FROM jsonb_array_elements(dfr_json) v)"
+        )
+        # Plain CREATE INDEX: validation_result is partitioned by now and
+        # CONCURRENTLY is not supported on partitioned parents.
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_validation_result_rule_ids "
+            "ON validation_result USING GIN (rule_ids)"
+        )
+    else:
+        op.add_column('validation_result', sa.Column('rule_ids', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_validation_result_rule_ids")
+    op.drop_column('validation_result', 'rule_ids')
@@ -8,15 +8,25 @@ Uses Gemini 3 Pro (primary) with Gemini 2.5 Pro (auto-fallback).
 - Rate limited: 15 RPM, 1500 RPD per model
 - Auto-switches to fallback on quota/availability errors
 """
+import asyncio
+import hashlib
+import threading
+import time
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from typing import Optional
 import json
+import re
 import uuid
 import logging
 
+import orjson
+
 from app.api.routes.auth import get_current_user, get_db
+from app.core.audit import enqueue_audit
 from app.db.models import User, AuditLog, AISuggestion as AISuggestionModel
 from app.db.schemas import AISuggestionRequest, AISuggestionResponse, PlanPatchSchema
 from app.core.rate_limiter import (
@@ -28,6 +38,10 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Validates the whole suggestion list in one C-level pass instead of
+# constructing models one at a time.
+_SUGGESTION_LIST_ADAPTER = TypeAdapter(list[AISuggestionResponse])
+
 # ── Built-in Prompt ──
 BUILTIN_PROMPT = """You are a strict architectural governance assistant. Given a Deterministic Failure Report (DFR) containing architectural violations, suggest structured fixes.
 
@@ -44,22 +58,73 @@ DFR:
 
 Return ONLY a valid JSON array of fix objects. No markdown fences. No explanations. Just the JSON array."""
 
+# ── Precompiled error classifiers ──
+# One compiled scan per check instead of a chain of Python substring tests;
+# Gemini error bodies can be kilobytes of HTML.
+_FALLBACK_RE = re.compile(
+    r"RESOURCE_EXHAUSTED|quota|\b429\b|not found|\b404\b|not supported"
+    r"|temporarily unavailable|\b503\b",
+    re.IGNORECASE,
+)
+_INVALID_KEY_RE = re.compile(r"API_KEY_INVALID|API key not valid")
+_QUOTA_RE = re.compile(r"RESOURCE_EXHAUSTED|quota", re.IGNORECASE)
+_SAFETY_RE = re.compile(r"SAFETY")
+
+# Strips leading/trailing markdown fences in one pass (no per-line split/rejoin)
+_FENCE_RE = re.compile(r"^```[^\n]*\n|\n?```\s*$", re.MULTILINE)
+
+# ── Model cache ──
+# GenerativeModel construction + genai.configure run on every request even
+# though the (key, model) pair is stable per user. Cache model objects for
+# 15 minutes keyed by a blake2b hash of the key (the raw key is NEVER stored
+# or logged).
+_MODEL_CACHE_TTL = 900  # seconds
+_MODEL_CACHE_MAX = 1024
+_model_cache: dict = {}  # (key_hash, api_model_name) -> (expires_at, model)
+_model_cache_lock = threading.Lock()
+
+
+def _get_model(api_key: str, api_model_name: str):
+    """Return a (possibly cached) GenerativeModel bound to this key's client."""
+    import google.generativeai as genai
+    from google.generativeai import client as genai_client
+
+    key_hash = hashlib.blake2b(api_key.encode(), digest_size=16).hexdigest()
+    cache_key = (key_hash, api_model_name)
+    now = time.monotonic()
+
+    with _model_cache_lock:
+        cached = _model_cache.get(cache_key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        # genai.configure mutates process-global client state, and the SDK
+        # binds the client lazily at the first generate_content — which runs
+        # on the threadpool, outside this lock. Build the client here, while
+        # the configured key is still ours, and attach it to the model
+        # instance so a concurrent checkout with a different key can never
+        # leak into this model's calls.
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(api_model_name)
+        model._client = genai_client.get_default_generative_client()
+        if len(_model_cache) >= _MODEL_CACHE_MAX:
+            _model_cache.clear()
+        _model_cache[cache_key] = (now + _MODEL_CACHE_TTL, model)
+        return model
+
 
 def _call_gemini(api_key: str, prompt: str, model_id: str = PRIMARY_MODEL) -> list[dict]:
     """
     Call a Gemini model with the user's BYOK key.
     Returns parsed list of suggestion dicts.
     """
-    import google.generativeai as genai
-
     # Get API model name from config
     model_cfg = MODELS.get(model_id, MODELS[PRIMARY_MODEL])
     api_model_name = model_cfg["api_name"]
 
-    # Configure with user's key (per-request, not stored)
-    genai.configure(api_key=api_key)
-
-    model = genai.GenerativeModel(api_model_name)
+    # Cached per (key hash, model); carries a client bound to the user's
+    # key (the raw key is not stored)
+    model = _get_model(api_key, api_model_name)
 
     response = model.generate_content(
         prompt,
@@ -73,9 +138,7 @@ def _call_gemini(api_key: str, prompt: str, model_id: str = PRIMARY_MODEL) -> li
 
     # Strip markdown fences if the model wraps output
     if raw_text.startswith("```"):
-        lines = raw_text.split("\n")
-        lines = [l for l in lines if not l.strip().startswith("```")]
-        raw_text = "\n".join(lines)
+        raw_text = _FENCE_RE.sub("", raw_text).strip()
 
     parsed = json.loads(raw_text)
 
@@ -99,11 +162,7 @@ def _call_with_fallback(api_key: str, prompt: str) -> tuple[list[dict], str]:
 
     except Exception as primary_error:
         error_msg = str(primary_error)
-        is_quota_or_availability = any(kw in error_msg for kw in [
-            "RESOURCE_EXHAUSTED", "quota", "429",
-            "not found", "404", "not supported",
-            "temporarily unavailable", "503"
-        ])
+        is_quota_or_availability = bool(_FALLBACK_RE.search(error_msg))
 
         if not is_quota_or_availability:
             # Not a fallback-able error — re-raise as-is
@@ -132,7 +191,7 @@ def _raise_gemini_error(error_msg: str, fallback_model: bool = False):
     """Classify a Gemini error and raise the appropriate HTTPException."""
     model_label = "Both Gemini 3 Pro and 2.5 Pro" if fallback_model else "Gemini"
 
-    if "API_KEY_INVALID" in error_msg or "API key not valid" in error_msg:
+    if _INVALID_KEY_RE.search(error_msg):
         raise HTTPException(
             status_code=403,
             detail={
@@ -141,7 +200,7 @@ def _raise_gemini_error(error_msg: str, fallback_model: bool = False):
                 "help": "Get a valid key from https://aistudio.google.com/apikey"
             }
         )
-    elif "RESOURCE_EXHAUSTED" in error_msg or "quota" in error_msg.lower():
+    elif _QUOTA_RE.search(error_msg):
         raise HTTPException(
             status_code=429,
             detail={
@@ -149,7 +208,7 @@ def _raise_gemini_error(error_msg: str, fallback_model: bool = False):
                 "message": f"{model_label} quota exhausted. Wait and try again.",
             }
         )
-    elif "SAFETY" in error_msg:
+    elif _SAFETY_RE.search(error_msg):
         raise HTTPException(
             status_code=400,
             detail={
@@ -206,17 +265,24 @@ async def suggest_fixes(
     response.headers["X-RateLimit-RPD-Limit"] = str(rate_info["rpd_limit"])
     response.headers["X-RateLimit-Model"] = rate_info["model"]
 
-    # 3. Build prompt
+    # 3. Build prompt.
+    # Compact orjson dump: faster than stdlib json with indent=2, and the
+    # model doesn't need the whitespace (fewer prompt tokens, too).
+    dfr_json_str = orjson.dumps(request.dfr_json).decode()
     if request.prompt_mode == "builtin":
-        prompt = BUILTIN_PROMPT.format(dfr_json=json.dumps(request.dfr_json, indent=2))
+        prompt = BUILTIN_PROMPT.format(dfr_json=dfr_json_str)
     else:
         if not request.custom_prompt:
             raise HTTPException(status_code=400, detail="custom_prompt required when prompt_mode is 'custom'")
-        prompt = request.custom_prompt + f"\n\nDFR:\n{json.dumps(request.dfr_json, indent=2)}"
+        prompt = request.custom_prompt + f"\n\nDFR:\n{dfr_json_str}"
 
-    # 4. Call Gemini with auto-fallback
+    # 4. Call Gemini with auto-fallback.
+    # generate_content is a blocking HTTP call that can take seconds; run it
+    # on the threadpool so it doesn't pin the event loop for other requests.
     try:
-        raw_suggestions, model_used = _call_with_fallback(x_gemini_key, prompt)
+        raw_suggestions, model_used = await asyncio.to_thread(
+            _call_with_fallback, x_gemini_key, prompt
+        )
     except HTTPException:
         raise  # Already classified
     except json.JSONDecodeError as e:
@@ -237,46 +303,60 @@ async def suggest_fixes(
     if model_used != PRIMARY_MODEL:
         response.headers["X-AI-Fallback"] = "true"
 
-    # 5. Parse into structured responses
-    suggestions = []
+    # 5. Parse into structured responses.
+    # Pre-shape plain dicts, then validate the whole list in one
+    # TypeAdapter pass; fall back to per-item validation only if the batch
+    # contains a bad entry so good suggestions are still returned.
     violations = request.dfr_json.get("violations", [])
     violation_ids = [v.get("id", f"v_{i}") for i, v in enumerate(violations)]
 
+    prepared = []
     for i, raw in enumerate(raw_suggestions):
-        try:
-            patch = PlanPatchSchema(
-                operation=raw.get("operation", "modify"),
-                type=raw.get("type", "resource"),
-                target_path=raw.get("target_path", "unknown"),
-                method=raw.get("method"),
-                details=raw.get("details", {}),
-                confidence=raw.get("confidence", "medium")
-            )
-
-            violation_id = violation_ids[i] if i < len(violation_ids) else f"suggestion_{i}"
-
-            suggestions.append(AISuggestionResponse(
-                violation_id=violation_id,
-                suggestion=raw.get("details", {}).get("description", f"Fix: {raw.get('operation', 'modify')} {raw.get('type', 'resource')} at {raw.get('target_path', 'unknown')}"),
-                confidence=raw.get("confidence", "medium"),
-                patches=[patch]
-            ))
-        except Exception as e:
-            logger.warning(f"Failed to parse suggestion {i}: {e}")
+        if not isinstance(raw, dict):
+            logger.warning(f"Skipping non-object suggestion {i}")
             continue
 
-    # 6. Persist suggestions
-    suggestion_record = AISuggestionModel(
+        details = raw.get("details", {})
+        prepared.append({
+            "violation_id": violation_ids[i] if i < len(violation_ids) else f"suggestion_{i}",
+            "suggestion": details.get("description", f"Fix: {raw.get('operation', 'modify')} {raw.get('type', 'resource')} at {raw.get('target_path', 'unknown')}") if isinstance(details, dict) else str(details),
+            "confidence": raw.get("confidence", "medium"),
+            "patches": [{
+                "operation": raw.get("operation", "modify"),
+                "type": raw.get("type", "resource"),
+                "target_path": raw.get("target_path", "unknown"),
+                "method": raw.get("method"),
+                "details": details if isinstance(details, dict) else {},
+                "confidence": raw.get("confidence", "medium")
+            }]
+        })
+
+    try:
+        suggestions = _SUGGESTION_LIST_ADAPTER.validate_python(prepared)
+    except ValidationError:
+        suggestions = []
+        for i, item in enumerate(prepared):
+            try:
+                suggestions.append(AISuggestionResponse.model_validate(item))
+            except ValidationError as e:
+                logger.warning(f"Failed to parse suggestion {i}: {e}")
+                continue
+
+    # 6. Persist suggestions.
+    # Core insert instead of ORM add(): no unit-of-work flush bookkeeping
+    # and no post-insert refresh SELECT.
+    db.execute(insert(AISuggestionModel).values(
         user_id=current_user.id,
         plan_hash=request.plan_hash,
         engine_version=request.engine_version,
-        suggestion_json=json.dumps([s.model_dump() for s in suggestions]),
+        suggestion_json=_SUGGESTION_LIST_ADAPTER.dump_python(suggestions),
         prompt_mode=request.prompt_mode
-    )
-    db.add(suggestion_record)
+    ))
+    db.commit()
 
-    # Audit log
-    audit = AuditLog(
+    # Audit log is telemetry: fire-and-forget, batched by the audit worker
+    # off the critical path.
+    enqueue_audit(
         request_id=uuid.uuid4(),
         user_id=current_user.id,
         action="ai_suggest",
@@ -284,9 +364,6 @@ async def suggest_fixes(
         status="success",
         violations_count=len(violations)
     )
-    db.add(audit)
-
-    db.commit()
 
     return suggestions
 
@@ -295,12 +372,15 @@ async def suggest_fixes(
 async def get_suggestions(
     plan_hash: str,
     engine_version: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Query stored AI suggestions by plan_hash.
     Optionally filter by engine_version to avoid stale suggestions.
+    Paginated (newest first) so popular plans don't load their whole history.
     """
     query = db.query(AISuggestionModel).filter(
         AISuggestionModel.user_id == current_user.id,
@@ -310,14 +390,19 @@ async def get_suggestions(
     if engine_version:
         query = query.filter(AISuggestionModel.engine_version == engine_version)
 
-    records = query.order_by(AISuggestionModel.created_at.desc()).all()
+    records = (
+        query.order_by(AISuggestionModel.created_at.desc())
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
 
     return [
         {
             "id": str(r.id),
             "plan_hash": r.plan_hash,
             "engine_version": r.engine_version,
-            "suggestions": json.loads(r.suggestion_json),
+            "suggestions": r.suggestion_json,  # native JSON column, already parsed
             "prompt_mode": r.prompt_mode,
             "created_at": r.created_at.isoformat()
         }
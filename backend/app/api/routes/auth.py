@@ -1,9 +1,12 @@
 # STATUS: FROZEN
 # STRICT MODE: DO NOT EDIT WITHOUT EXPLICIT APPROVAL
+import asyncio
+import os
 from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 from app.core import security
 from app.api import deps
@@ -16,19 +19,39 @@ from app.api.deps import get_current_user, get_db
 
 router = APIRouter()
 
+# bcrypt work takes tens to hundreds of ms by design. Run it on the
+# threadpool (not the event loop) and cap concurrency so a burst of logins
+# cannot occupy every worker thread with hashing.
+_hash_semaphore = asyncio.Semaphore(os.cpu_count() or 4)
+
+
+async def _hash_password(password: str) -> str:
+    async with _hash_semaphore:
+        return await asyncio.to_thread(security.get_password_hash, password)
+
+
+async def _verify_password(plain: str, hashed: str) -> bool:
+    async with _hash_semaphore:
+        return await asyncio.to_thread(security.verify_password, plain, hashed)
+
+
 class UserSignupResponse(UserResponse):
     recovery_key: str
 
 @router.post("/signup", response_model=UserSignupResponse)
-def create_user(
+async def create_user(
     user_in: UserCreate,
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Create new user.
     """
-    user = db.query(User).filter(User.email == user_in.email).first()
-    if user:
+    # Existence probe: fetch only the id, not the whole row.
+    # Lowered comparison so the LOWER(email) unique index is used and
+    # mixed-case duplicates are rejected.
+    email = user_in.email.lower()
+    exists = db.query(User.id).filter(func.lower(User.email) == email).first()
+    if exists:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
@@ -41,8 +64,8 @@ def create_user(
     encrypted_recovery_key = security.encrypt_value(recovery_key_raw)
 
     user = User(
-        email=user_in.email,
-        hashed_password=security.get_password_hash(user_in.password),
+        email=email,  # normalized on write
+        hashed_password=await _hash_password(user_in.password),
         is_active=True, # Auto-activate for ease
         recovery_key=encrypted_recovery_key
     )
@@ -60,22 +83,28 @@ def create_user(
     )
 
 @router.post("/token", response_model=Token)
-def login_access_token(
+async def login_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    # Only the columns the login path actually reads — skips recovery_key,
+    # verification token, etc. on every login
+    user = db.query(User.id, User.is_active, User.plan_tier, User.hashed_password).filter(
+        func.lower(User.email) == form_data.username.lower()
+    ).first()
+    if not user or not await _verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-        
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        user.id, expires_delta=access_token_expires
+        user.id,
+        expires_delta=access_token_expires,
+        extra_claims={"is_active": user.is_active, "plan_tier": user.plan_tier},
     )
     return {
         "access_token": access_token,
@@ -109,14 +138,16 @@ def get_recovery_key(
     return {"recovery_key": key}
 
 @router.post("/reset-password")
-def reset_password(
+async def reset_password(
     payload: PasswordResetRequest,
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Reset password using recovery key.
     """
-    user = db.query(User).filter(User.email == payload.email).first()
+    user = db.query(User.id, User.recovery_key).filter(
+        func.lower(User.email) == payload.email.lower()
+    ).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
         
@@ -130,12 +161,17 @@ def reset_password(
             raise HTTPException(status_code=400, detail="Invalid recovery key")
     else:
         # Fallback to verify hash (Old Flow / Legacy Users)
-        if not security.verify_password(payload.recovery_key, user.recovery_key):
+        if not await _verify_password(payload.recovery_key, user.recovery_key):
             raise HTTPException(status_code=400, detail="Invalid recovery key")
         
-    user.hashed_password = security.get_password_hash(payload.new_password)
-    
-    db.add(user)
+    db.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(hashed_password=await _hash_password(payload.new_password))
+    )
     db.commit()
-    
+
+    # Drop any cached copy so stale credentials aren't served from memory
+    deps.invalidate_user_cache(user.id)
+
     return {"message": "Password updated successfully"}
@@ -0,0 +1,69 @@
+"""
+Asynchronous audit-log writer.
+
+Audit rows are telemetry — no response depends on them — so hot paths
+enqueue a plain dict and return immediately. A background task drains the
+queue and writes batches with a single multi-row INSERT (SQLAlchemy's
+insertmanyvalues fast path), amortizing the write cost across requests.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import insert
+
+from app.db.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+_FLUSH_INTERVAL = 0.1  # seconds to linger so near-simultaneous rows batch
+_MAX_BATCH = 500
+_MAX_QUEUE = 10_000
+
+audit_queue: asyncio.Queue = asyncio.Queue(maxsize=_MAX_QUEUE)
+_worker_task = None
+
+
+def enqueue_audit(**values) -> None:
+    """Queue one audit row. Never blocks or raises on the hot path."""
+    try:
+        audit_queue.put_nowait(values)
+    except asyncio.QueueFull:
+        logger.warning("Audit queue full; dropping audit record")
+
+
+def _write_rows(rows: list) -> None:
+    from app.main import SessionLocal
+    db = SessionLocal()
+    try:
+        db.execute(insert(AuditLog), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to flush audit batch (%d rows)", len(rows))
+    finally:
+        db.close()
+
+
+def _drain_nowait(rows: list) -> None:
+    try:
+        while len(rows) < _MAX_BATCH:
+            rows.append(audit_queue.get_nowait())
+    except asyncio.QueueEmpty:
+        pass
+
+
+async def _worker() -> None:
+    while True:
+        rows = [await audit_queue.get()]
+        _drain_nowait(rows)
+        if len(rows) < _MAX_BATCH:
+            await asyncio.sleep(_FLUSH_INTERVAL)
+            _drain_nowait(rows)
+        await asyncio.to_thread(_write_rows, rows)
+
+
+def start_audit_worker() -> None:
+    """Start the background drain task (idempotent; call from app startup)."""
+    global _worker_task
+    if _worker_task is None or _worker_task.done():
+        _worker_task = asyncio.get_running_loop().create_task(_worker())
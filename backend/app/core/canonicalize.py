@@ -1,29 +1,41 @@
-import json
-from typing import Any, Dict, List
+import orjson
+from typing import Any
 
-def sort_lists_in_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+
+def _canonical_bytes(obj: Any) -> bytes:
+    """
+    Serialize one value to canonical JSON bytes in a single traversal:
+    dict keys are emitted in sorted order, list elements are sorted by
+    their own canonical bytes (a total order — no TypeError fallbacks
+    for mixed lists), and key/scalar encoding is delegated to orjson so
+    string escaping stays at C speed. Compared to the old
+    sort-copy-then-serialize pair, the plan tree is walked once instead
+    of twice and no intermediate sorted copy is allocated.
+    """
+    if isinstance(obj, dict):
+        return b'{' + b','.join(
+            orjson.dumps(k) + b':' + _canonical_bytes(v)
+            for k, v in sorted(obj.items())
+        ) + b'}'
+    if isinstance(obj, list):
+        return b'[' + b','.join(sorted(_canonical_bytes(x) for x in obj)) + b']'
+    return orjson.dumps(obj)
+
+
+def canonicalize_json_bytes(data: Any) -> bytes:
     """
-    Recursively sort lists in the plan to ensure deterministic ordering.
+    Canonical JSON bytes for hashing.
+    Keys sorted, lists sorted, no whitespace. Deterministic for any
+    JSON-serializable input; list order is by canonical byte string,
+    which changed the hash scheme — ENGINE_VERSION covers this file and
+    rotates with it.
     """
-    if isinstance(plan, dict):
-        return {k: sort_lists_in_plan(v) for k, v in sorted(plan.items())}
-    elif isinstance(plan, list):
-        # Try to sort using a stable key. 
-        # For objects with 'id', use 'id'.
-        # For strings, just sort.
-        sorted_list = [sort_lists_in_plan(x) for x in plan]
-        try:
-            return sorted(sorted_list, key=lambda x: x.get('id') if isinstance(x, dict) and 'id' in x else str(x))
-        except:
-            # Fallback if mixed types or no ID
-            return sorted(sorted_list, key=lambda x: str(x))
-    else:
-        return plan
+    return _canonical_bytes(data)
+
 
 def canonicalize_json(data: Any) -> str:
     """
     Returns a canonical JSON string for hashing.
-    Keys sorted, lists sorted (where possible), no whitespace.
+    Keys sorted, lists sorted, no whitespace.
     """
-    sorted_data = sort_lists_in_plan(data)
-    return json.dumps(sorted_data, sort_keys=True, separators=(',', ':'))
+    return canonicalize_json_bytes(data).decode()
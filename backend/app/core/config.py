@@ -1,16 +1,18 @@
 
+from functools import lru_cache
 from typing import List, Union
-from pydantic import AnyHttpUrl, validator
+from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Governance Engine"
     API_V1_STR: str = "/api/v1"
-    
+
     # CORS
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
-    @validator("BACKEND_CORS_ORIGINS", pre=True)
+    @field_validator("BACKEND_CORS_ORIGINS", mode="before")
+    @classmethod
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> List[str]:
         if isinstance(v, str) and not v.startswith("["):
             return [i.strip() for i in v.split(",")]
@@ -21,7 +23,13 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./governance.db"
 
-    @validator("DATABASE_URL", pre=True)
+    # Dev/test convenience: create tables from the models at startup.
+    # Set False in production — Alembic owns the schema there, and
+    # create_all re-runs introspection in every worker process.
+    AUTO_CREATE_TABLES: bool = True
+
+    @field_validator("DATABASE_URL", mode="before")
+    @classmethod
     def assemble_db_connection(cls, v: Union[str, None]) -> Union[str, None]:
         if isinstance(v, str) and v.startswith("postgres://"):
             return v.replace("postgres://", "postgresql://", 1)
@@ -35,6 +43,20 @@ class Settings(BaseSettings):
     # AI Provider - Gemini
     GEMINI_API_KEY: str | None = None  # Optional, usually BYOK per user
 
+    # Rate limiting - optional Redis fast path (falls back to SQL tracker)
+    REDIS_URL: str | None = None
+
     model_config = SettingsConfigDict(case_sensitive=True, env_file=".env")
 
-settings = Settings()
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Cached factory — validates the environment exactly once per process.
+
+    Also usable as a FastAPI dependency (Depends(get_settings)), which
+    tests can override without monkeypatching the module global.
+    """
+    return Settings()
+
+
+settings = get_settings()
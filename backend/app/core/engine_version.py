@@ -1,4 +1,7 @@
 import hashlib
+import json
+import os
+import tempfile
 from pathlib import Path
 
 ENGINE_FILES = [
@@ -9,27 +12,74 @@ ENGINE_FILES = [
     "app/core/canonicalize.py",
 ]
 
+# On-disk cache of per-file hashes keyed by (mtime_ns, size). Engine files
+# rarely change, but this module re-hashes them at import in every worker
+# process and test run; a stat() match skips the read+hash entirely.
+CACHE_FILE_NAME = ".engine_version_cache.json"
+
+
+def _load_hash_cache(cache_path: Path) -> dict:
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_hash_cache(cache_path: Path, cache: dict) -> None:
+    # Atomic write so concurrent workers never read a torn file
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=str(cache_path.parent), prefix=".engine_cache_")
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, str(cache_path))
+    except OSError:
+        pass  # Cache is best-effort; never fail version computation over it
+
+
+def _hash_file(file_path: Path, cache: dict) -> tuple:
+    """Return (hexdigest, cache_dirty) for one engine file."""
+    if not file_path.exists():
+        # In dev/early stages, file might not exist yet.
+        # We treat missing file as empty content for stability, or raise error.
+        # Raising error is safer for "Strict Governance".
+        # For now, we'll log warning and use empty hash to allow bootstrapping.
+        print(f"WARNING: Engine file not found: {file_path}")
+        return hashlib.sha256(b"").hexdigest(), False
+
+    stat = file_path.stat()
+    key = str(file_path)
+    entry = cache.get(key)
+    if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+        return entry["sha256"], False
+
+    # Stream the hash instead of materialising the whole file in memory
+    with open(file_path, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+    cache[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+    return digest, True
+
+
 def compute_engine_version(base_dir: Path) -> str:
     """
     Compute SHA-256 hash of all engine source files to determine version.
     Current Engine Version = Hash(sorted(Hash(file) for file in ENGINE_FILES))
+    Per-file hashes are cached on disk keyed by (mtime_ns, size), so warm
+    starts cost N stat() calls instead of N read+hash passes.
     """
+    cache_path = base_dir / CACHE_FILE_NAME
+    cache = _load_hash_cache(cache_path)
+    cache_dirty = False
+
     file_hashes = []
-    
     for relative_path in sorted(ENGINE_FILES):
-        file_path = base_dir / relative_path
-        if not file_path.exists():
-            # In dev/early stages, file might not exist yet. 
-            # We treat missing file as empty content for stability, or raise error.
-            # Raising error is safer for "Strict Governance".
-            # For now, we'll log warning and use empty hash to allow bootstrapping.
-            print(f"WARNING: Engine file not found: {file_path}")
-            content = b""
-        else:
-            content = file_path.read_bytes()
-            
-        file_hashes.append(hashlib.sha256(content).hexdigest())
-    
+        digest, dirty = _hash_file(base_dir / relative_path, cache)
+        file_hashes.append(digest)
+        cache_dirty = cache_dirty or dirty
+
+    if cache_dirty:
+        _save_hash_cache(cache_path, cache)
+
     # Hash of the combined hashes
     combined = "".join(file_hashes)
     return hashlib.sha256(combined.encode()).hexdigest()[:16]
@@ -1,10 +1,15 @@
 
 from fastapi import HTTPException, status
+from sqlalchemy import case, insert, or_, update
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.db.models import AIRateLimitTracker
 from datetime import datetime, timedelta
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
 # ── Model Configurations ──
 # Only 2 models: Gemini 3 Pro (primary) and Gemini 2.5 Pro (fallback)
 MODELS = {
@@ -36,47 +41,43 @@ def get_model_limits(model_id: str) -> tuple[int, int]:
     return cfg.get("rpm_limit", RPM_LIMIT), cfg.get("rpd_limit", RPD_LIMIT)
 
 
-def check_rate_limit(db: Session, user_id: uuid.UUID, model_id: str = PRIMARY_MODEL):
-    """
-    Enforce Rate Limits (RPM, RPD) using Database.
-    Supports per-model limits for Gemini 3 Pro and Gemini 2.5 Pro.
-
-    Returns dict with remaining counts for response headers.
-    """
-    rpm_limit, rpd_limit = get_model_limits(model_id)
-    now = datetime.utcnow()
-
-    # 1. Fetch or Create Tracker
-    tracker = db.query(AIRateLimitTracker).filter(
-        AIRateLimitTracker.user_id == user_id,
-        AIRateLimitTracker.model_id == model_id
-    ).with_for_update().first()
-
-    if not tracker:
-        tracker = AIRateLimitTracker(
-            user_id=user_id,
-            model_id=model_id,
-            rpm_count=0,
-            rpd_count=0,
-            last_request_at=now,
-            daily_reset_at=now + timedelta(days=1)
-        )
-        db.add(tracker)
+# ── Redis fast path ──
+# When REDIS_URL is configured, counters live in Redis: two atomic INCRs
+# per request instead of a SQL transaction with a row lock. The SQL
+# tracker below stays as the fallback (and the dev default), including at
+# runtime: any Redis error degrades the request to the SQL path instead
+# of failing it. Requires Redis server >= 7.0 (EXPIRE ... NX); on older
+# servers every call errors and traffic runs on the SQL tracker.
+_redis_client = None
 
-    # 2. Reset Counters if windows expired
-    if now - tracker.last_request_at > timedelta(minutes=1):
-        tracker.rpm_count = 0
 
-    if now >= tracker.daily_reset_at:
-        tracker.rpd_count = 0
-        tracker.daily_reset_at = now + timedelta(days=1)
+def _get_redis():
+    global _redis_client
+    if _redis_client is None and settings.REDIS_URL:
+        import redis
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _redis_client
 
-    # 3. Calculate remaining BEFORE incrementing
-    rpm_remaining = max(0, rpm_limit - tracker.rpm_count)
-    rpd_remaining = max(0, rpd_limit - tracker.rpd_count)
 
-    # 4. Enforce Limits
-    if tracker.rpm_count >= rpm_limit:
+def _check_rate_limit_redis(r, user_id: uuid.UUID, model_id: str, rpm_limit: int, rpd_limit: int):
+    now = datetime.utcnow()
+    minute_key = f"rl:{user_id}:{model_id}:min:{now:%Y%m%d%H%M}"
+    day_key = f"rl:{user_id}:{model_id}:day:{now:%Y%m%d}"
+
+    # Day counter expires at the date rollover the key encodes, not a
+    # fixed 86400s — otherwise a quota consumed late in the day would
+    # leak into the next one.
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    secs_to_midnight = max(int((midnight - now).total_seconds()), 1)
+
+    pipe = r.pipeline()
+    pipe.incr(minute_key)
+    pipe.expire(minute_key, 60, nx=True)
+    pipe.incr(day_key)
+    pipe.expire(day_key, secs_to_midnight, nx=True)
+    rpm_count, _, rpd_count, _ = pipe.execute()
+
+    if rpm_count > rpm_limit:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
@@ -89,32 +90,152 @@ def check_rate_limit(db: Session, user_id: uuid.UUID, model_id: str = PRIMARY_MO
             }
         )
 
-    if tracker.rpd_count >= rpd_limit:
+    if rpd_count > rpd_limit:
+        resets_at = midnight
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
                 "type": "daily_quota_exceeded",
-                "message": f"Daily quota reached ({rpd_limit} requests/day). Resets at {tracker.daily_reset_at.isoformat()}Z.",
+                "message": f"Daily quota reached ({rpd_limit} requests/day). Resets at {resets_at.isoformat()}Z.",
                 "rpd_limit": rpd_limit,
-                "resets_at": tracker.daily_reset_at.isoformat(),
+                "resets_at": resets_at.isoformat(),
                 "model": model_id
             }
         )
 
-    # 5. Increment
-    tracker.rpm_count += 1
-    tracker.rpd_count += 1
-    tracker.last_request_at = now
+    return {
+        "rpm_remaining": rpm_limit - rpm_count,
+        "rpd_remaining": rpd_limit - rpd_count,
+        "rpm_limit": rpm_limit,
+        "rpd_limit": rpd_limit,
+        "model": model_id
+    }
+
+
+def check_rate_limit(db: Session, user_id: uuid.UUID, model_id: str = PRIMARY_MODEL):
+    """
+    Enforce Rate Limits (RPM, RPD) using Database.
+    Supports per-model limits for Gemini 3 Pro and Gemini 2.5 Pro.
+
+    Returns dict with remaining counts for response headers.
+    """
+    rpm_limit, rpd_limit = get_model_limits(model_id)
+
+    redis_client = _get_redis()
+    if redis_client is not None:
+        import redis
+        try:
+            return _check_rate_limit_redis(redis_client, user_id, model_id, rpm_limit, rpd_limit)
+        except redis.RedisError as e:
+            # Redis outage (or a pre-7.0 server rejecting EXPIRE NX):
+            # degrade to the SQL tracker rather than 500 every AI request.
+            logger.warning(f"Redis rate limiter unavailable, falling back to SQL: {e}")
+
+    now = datetime.utcnow()
+    minute_ago = now - timedelta(minutes=1)
+
+    # 1. Atomic check-and-increment: one UPDATE with window resets folded
+    # into CASE expressions, gated by the limits in the WHERE clause.
+    # No SELECT ... FOR UPDATE, so concurrent checks for the same user
+    # don't serialize on a row lock held across Python latency.
+    stmt = (
+        update(AIRateLimitTracker)
+        .where(
+            AIRateLimitTracker.user_id == user_id,
+            AIRateLimitTracker.model_id == model_id,
+            # Window-expired counters never block: they reset to 1 below
+            or_(AIRateLimitTracker.last_request_at < minute_ago,
+                AIRateLimitTracker.rpm_count < rpm_limit),
+            or_(AIRateLimitTracker.daily_reset_at <= now,
+                AIRateLimitTracker.rpd_count < rpd_limit),
+        )
+        .values(
+            rpm_count=case(
+                (AIRateLimitTracker.last_request_at < minute_ago, 1),
+                else_=AIRateLimitTracker.rpm_count + 1,
+            ),
+            rpd_count=case(
+                (AIRateLimitTracker.daily_reset_at <= now, 1),
+                else_=AIRateLimitTracker.rpd_count + 1,
+            ),
+            daily_reset_at=case(
+                (AIRateLimitTracker.daily_reset_at <= now, now + timedelta(days=1)),
+                else_=AIRateLimitTracker.daily_reset_at,
+            ),
+            last_request_at=now,
+        )
+        .returning(
+            AIRateLimitTracker.rpm_count,
+            AIRateLimitTracker.rpd_count,
+        )
+    )
 
     try:
-        db.commit()
+        row = db.execute(stmt).first()
+
+        if row is None:
+            # Either no tracker row yet, or a limit tripped. A cheap read
+            # (no lock) distinguishes the two.
+            tracker = db.query(
+                AIRateLimitTracker.rpm_count,
+                AIRateLimitTracker.rpd_count,
+                AIRateLimitTracker.last_request_at,
+                AIRateLimitTracker.daily_reset_at,
+            ).filter(
+                AIRateLimitTracker.user_id == user_id,
+                AIRateLimitTracker.model_id == model_id
+            ).first()
+
+            if tracker is None:
+                # First request for this user/model: create the row with
+                # this request already counted.
+                db.execute(insert(AIRateLimitTracker).values(
+                    user_id=user_id,
+                    model_id=model_id,
+                    rpm_count=1,
+                    rpd_count=1,
+                    last_request_at=now,
+                    daily_reset_at=now + timedelta(days=1),
+                ))
+                db.commit()
+                row = (1, 1)
+            else:
+                db.rollback()
+                if tracker.last_request_at >= minute_ago and tracker.rpm_count >= rpm_limit:
+                    raise HTTPException(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        detail={
+                            "type": "rate_limit_exceeded",
+                            "message": f"Rate limit exceeded ({rpm_limit} requests/minute). Wait 60 seconds.",
+                            "retry_after_seconds": 60,
+                            "rpm_limit": rpm_limit,
+                            "rpd_limit": rpd_limit,
+                            "model": model_id
+                        }
+                    )
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail={
+                        "type": "daily_quota_exceeded",
+                        "message": f"Daily quota reached ({rpd_limit} requests/day). Resets at {tracker.daily_reset_at.isoformat()}Z.",
+                        "rpd_limit": rpd_limit,
+                        "resets_at": tracker.daily_reset_at.isoformat(),
+                        "model": model_id
+                    }
+                )
+        else:
+            db.commit()
+
+    except HTTPException:
+        raise
     except Exception:
         db.rollback()
         raise HTTPException(status_code=500, detail="Rate limiter error")
 
+    rpm_count, rpd_count = row
     return {
-        "rpm_remaining": rpm_limit - tracker.rpm_count,
-        "rpd_remaining": rpd_limit - tracker.rpd_count,
+        "rpm_remaining": rpm_limit - rpm_count,
+        "rpd_remaining": rpd_limit - rpd_count,
         "rpm_limit": rpm_limit,
         "rpd_limit": rpd_limit,
         "model": model_id
@@ -1,7 +1,7 @@
 
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Text, UniqueConstraint, Index, desc, JSON
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.ext.declarative import declarative_base
@@ -57,14 +57,20 @@ class ValidationResult(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
     
-    plan_hash: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
-    engine_version: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    plan_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    engine_version: Mapped[str] = mapped_column(String(64), nullable=False)
     # Lifecycle: Store schema version to know how to validate/migrate old plans
     schema_version: Mapped[str] = mapped_column(String(16), default="1.0", nullable=False)
     
-    # Store JSONs. Use Text for SQLite/Generic compatibility, cast to JSONB in PG if needed.
+    # Canonical plan stays Text: it is only ever stored/returned verbatim.
     canonical_plan_json: Mapped[str] = mapped_column(Text, nullable=False)
-    dfr_json: Mapped[str] = mapped_column(Text, nullable=False)
+    # Violations as native JSON (JSONB on PostgreSQL) so cache hits and
+    # stats read parsed values instead of json.loads'ing TEXT.
+    dfr_json: Mapped[Any] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
+    # Parallel array of rule ids (struct-of-arrays): aggregation reads
+    # this small contiguous field instead of the violation documents.
+    # Nullable for rows written before the column existed.
+    rule_ids: Mapped[Any] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
     
     passed: Mapped[bool] = mapped_column(Boolean, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -72,8 +78,37 @@ class ValidationResult(Base):
     user = relationship("User", back_populates="validation_results")
 
     __table_args__ = (
-        # Idempotency constraint
-        UniqueConstraint('plan_hash', 'engine_version', name='uq_plan_engine_version'),
+        # Idempotency constraint. Includes user_id to match the partitioned
+        # PG DDL (a partitioned unique index must contain the partition
+        # key); cross-user duplicates are tolerated by design — plan_hash
+        # is a pure content hash, so any user's row answers the lookup.
+        UniqueConstraint('user_id', 'plan_hash', 'engine_version', name='uq_plan_engine_version'),
+        # Cache lookup path: _find_existing filters (plan_hash, engine_version)
+        Index('ix_vr_plan_engine', 'plan_hash', 'engine_version'),
+        # Stats: recent list (filter user_id, ORDER BY created_at DESC)
+        Index('ix_vr_user_created', 'user_id', desc('created_at')),
+        # Stats: failed-scan fallback; INCLUDE gives PG index-only scans
+        Index('ix_vr_user_passed_created', 'user_id', 'passed', desc('created_at'),
+              postgresql_include=['id', 'plan_hash']),
+    )
+
+class RuleViolationCounter(Base):
+    """
+    Incremental rollup of rule violations per user.
+
+    Maintained by the validate_plan write path (one upsert per rule) so the
+    stats endpoint reads a tiny indexed table instead of re-parsing the
+    last N DFR payloads on every request.
+    """
+    __tablename__ = "rule_violation_counter"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
+    rule_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'rule_id', name='uq_rule_counter_user_rule'),
     )
 
 class AuditLog(Base):
@@ -117,15 +152,22 @@ class AISuggestion(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
     
-    plan_hash: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    plan_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     engine_version: Mapped[str] = mapped_column(String(64), nullable=False)
-    
-    # Structured suggestions as JSON: List[PlanPatchSchema]
-    suggestion_json: Mapped[str] = mapped_column(Text, nullable=False)
-    
+
+    # Structured suggestions: List[PlanPatchSchema].
+    # Native JSON (JSONB on PostgreSQL) so reads return parsed values
+    # directly instead of TEXT that every caller json.loads's.
+    suggestion_json: Mapped[Any] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
+
     prompt_mode: Mapped[str] = mapped_column(String(16), default="builtin") # "builtin" | "custom"
-    
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    
+
     user = relationship("User", back_populates="ai_suggestions")
 
+    __table_args__ = (
+        # Covers the get_suggestions hot path: filter (user_id, plan_hash) + ORDER BY created_at DESC
+        Index('ix_ai_suggestions_user_plan_created', 'user_id', 'plan_hash', desc('created_at')),
+    )
+
@@ -1,18 +1,24 @@
 
 from typing import List, Dict, Optional, Literal, Any
-from pydantic import BaseModel, Field, AnyHttpUrl, validator, constr
+from pydantic import BaseModel, ConfigDict, Field, AnyHttpUrl, validator, constr
 from datetime import datetime
 import uuid
 
 # --- Plan Schema Models ---
 
+# Plan models are frozen: nothing mutates them after request validation,
+# and freezing skips per-instance __dict__ write plumbing and makes them
+# safely shareable across the caching layers.
+
 class Resource(BaseModel):
     id: str
     type: str # 'api', 'table', 'migration', 'topic', 'job'
     name: str
     description: Optional[str] = None
     properties: Dict[str, Any] = Field(default_factory=dict)
-    
+
+    model_config = ConfigDict(frozen=True)
+
 class Component(BaseModel):
     id: str
     name: str
@@ -21,22 +27,24 @@ class Component(BaseModel):
     resources: List[Resource] = Field(default_factory=list)
     dependencies: List[str] = Field(default_factory=list) # Component IDs
 
+    model_config = ConfigDict(frozen=True)
+
 class Relationship(BaseModel):
     source: str # Component ID or Resource ID
     target: str # Component ID or Resource ID
     type: Literal['calls', 'creates', 'reads', 'updates', 'deletes', 'depends_on']
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
+    model_config = ConfigDict(frozen=True)
+
 class PlanSchema(BaseModel):
     schema_version: str = Field(..., description="Version of the schema, e.g. '1.0'")
     project_name: str
     components: List[Component]
     relationships: List[Relationship]
     env_vars: Dict[str, str] = Field(default_factory=dict, description="Env vars with masked values or references")
-    
-    model_config = {
-        "extra": "forbid"
-    }
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
 
 # --- API Models ---
 
@@ -45,6 +53,9 @@ class DFR(BaseModel):
     engine_version: str
     passed: bool
     violations: List[Dict[str, Any]]
+    # Struct-of-arrays companion to violations: just the rule ids, in the
+    # same order, so aggregation paths never walk the violation dicts.
+    rule_ids: List[str] = Field(default_factory=list)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 class PlanPatchSchema(BaseModel):
@@ -56,6 +67,10 @@ class PlanPatchSchema(BaseModel):
     details: Dict[str, Any] = Field(default_factory=dict)
     confidence: Literal['high', 'medium', 'low'] = 'medium'
 
+    # Frozen: these are built in bulk on the /suggest hot path and never
+    # mutated after validation; extra keys from the model are dropped.
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
 class AISuggestionRequest(BaseModel):
     """Request body for /api/agent/suggest"""
     plan_hash: str
@@ -71,6 +86,8 @@ class AISuggestionResponse(BaseModel):
     confidence: Literal['high', 'medium', 'low']
     patches: List[PlanPatchSchema] = Field(default_factory=list)
 
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -78,6 +95,9 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     email: Optional[str] = None
     sub: Optional[str] = None
+    # Embedded claims so hot paths can skip the User SELECT entirely
+    is_active: Optional[bool] = None
+    plan_tier: Optional[str] = None
 
     model_config = {"extra": "allow"}
 
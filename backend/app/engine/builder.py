@@ -84,11 +84,13 @@ class Builder:
                 # Map to Structural Rule Failure
                 raise BuildError(f"Structural Violation (DEPENDENCY_EXISTS): {e}")
 
-        # 3. Reject Ambiguity (Core Requirement)
+        # 3. Freeze first — freezing only builds lookup caches, and the
+        # ambiguity check below reads through them.
+        graph.freeze()
+
+        # 4. Reject Ambiguity (Core Requirement)
         self._reject_ambiguity(graph)
 
-        # 4. Freeze
-        graph.freeze()
         return graph
 
     def _reject_ambiguity(self, graph: SystemGraph) -> None:
@@ -100,55 +102,36 @@ class Builder:
         """
         
         # 1. UNIQUE_ENDPOINT
-        api_nodes = graph.find_nodes_by_type('api_endpoint')
-        routes = {} # (method, path) -> list of node_ids
-        
-        for node in api_nodes:
-            props = node.properties or {}
-            method = props.get('method', '').upper()
-            path = props.get('path', '')
-            
-            if method and path:
-                key = (method, path)
-                if key in routes:
-                    raise BuildError(
-                        f"Structural Violation (UNIQUE_ENDPOINT): {method} {path} declared in multiple resources: "
-                        f"{routes[key]} and {node.id}"
-                    )
-                routes[key] = node.id
+        routes = {} # (method, path) -> first declaring node_id
+
+        for node in graph.find_nodes_by_type('api_endpoint'):
+            if not (node.method_upper and node.path):
+                continue
+            # setdefault fuses the membership check and insert into one
+            # hash probe; a different id coming back means a duplicate.
+            prev = routes.setdefault((node.method_upper, node.path), node.id)
+            if prev != node.id:
+                raise BuildError(
+                    f"Structural Violation (UNIQUE_ENDPOINT): {node.method_upper} {node.path} declared in multiple resources: "
+                    f"{prev} and {node.id}"
+                )
 
         # 2. NO_AMBIGUOUS_ROUTE (Resolution Check)
-        edges = graph.edges
-        for edge in edges:
+        for edge in graph.edges:
             if edge.type == 'calls':
                 # Check for explicit 'path' metadata leading to ambiguity
                 target_node = graph.get_node(edge.target)
-                call_path = edge.metadata.get('path') if edge.metadata else None
-                call_method = edge.metadata.get('method') if edge.metadata else None
-                
+                call_path = edge.call_path
+
                 if call_path and target_node.type == 'component':
-                     # Resolve call to component -> child resource
-                    children_edges = graph.find_outgoing_edges(target_node.id, 'contains')
-                    children_ids = [e.target for e in children_edges]
-                    
-                    found = []
-                    for child_id in children_ids:
-                        child = graph.get_node(child_id)
-                        if child.type == 'api_endpoint':
-                            props = child.properties or {}
-                            if props.get('path') == call_path:
-                                if call_method:
-                                    # Strict Method Match if provided
-                                    if props.get('method', '').upper() == call_method.upper():
-                                        found.append(child)
-                                else:
-                                    # Relaxed match (any method) - debatable for "Deterministic"
-                                    # But if method not specified in call, maybe any match is valid?
-                                    # User Constraints: "Input (Plan) -> Normalize". 
-                                    # Let's assume input always has method if it's an API call.
-                                    pass
-                                    found.append(child)
-                    
+                    # Resolve against the frozen endpoint index (O(1))
+                    found = graph.list_endpoints_at(target_node.id, call_path)
+                    if edge.call_method_upper:
+                        # Strict Method Match if provided
+                        found = [n for n in found if n.method_upper == edge.call_method_upper]
+                    # else: Relaxed match (any method) - debatable for "Deterministic"
+                    # but if method not specified in call, any match is considered.
+
                     if len(found) > 1:
                          raise BuildError(f"Structural Violation (NO_AMBIGUOUS_ROUTE): Call to {call_path} on {target_node.name} is ambiguous. Matches: {[n.id for n in found]}")
 
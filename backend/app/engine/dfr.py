@@ -1,33 +1,34 @@
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+from operator import attrgetter
 import hashlib
 from app.db.schemas import PlanSchema, DFR
 from app.engine.evaluators import Violation
 from app.core.engine_version import ENGINE_VERSION
-from app.core.canonicalize import canonicalize_json, sort_lists_in_plan
+from app.core.canonicalize import canonicalize_json_bytes
 
-def generate_dfr(plan: PlanSchema, violations: List[Violation]) -> DFR:
+def generate_dfr(plan: PlanSchema, violations: List[Violation], canonical_bytes: Optional[bytes] = None) -> DFR:
     """
     Generate a Deterministic Failure Report.
+
+    Callers that already canonicalized the plan (validate_plan does, for
+    its cache lookup) pass the bytes in so the plan is serialized once
+    per request instead of twice.
     """
-    # 1. Canonicalize Plan
-    # Convert Pydantic model to dict
-    plan_dict = plan.model_dump()
-    
-    # Sort lists to ensure stability
-    sorted_plan = sort_lists_in_plan(plan_dict)
-    
-    # Generate canonical JSON string (UNSCRUBBED for hashing)
+    # 1. Canonicalize Plan (UNSCRUBBED for hashing)
     # We must hash the raw inputs to ensure determinism.
     # Scrubbing is for storage/logging only.
-    canonical_json_raw = canonicalize_json(sorted_plan)
-    
+    # orjson output feeds sha256 directly — no intermediate str/encode pass.
+    if canonical_bytes is None:
+        canonical_bytes = canonicalize_json_bytes(plan.model_dump())
+
     # 2. Compute Plan Hash
-    plan_hash = hashlib.sha256(canonical_json_raw.encode()).hexdigest()
+    plan_hash = hashlib.sha256(canonical_bytes).hexdigest()
     
     # 3. Format Violations
     # Sort violations by rule_id and offending_node to ensure deterministic order in output
-    violations.sort(key=lambda v: (v.rule_id, v.offending_node))
+    violations.sort(key=attrgetter('rule_id', 'offending_node'))
     
     formatted_violations = [
         {
@@ -40,10 +41,15 @@ def generate_dfr(plan: PlanSchema, violations: List[Violation]) -> DFR:
     ]
     
     passed = len(formatted_violations) == 0
-    
-    return DFR(
+
+    # Trusted internal data — bypasses validation; do not use for external
+    # input. model_construct skips default factories, so timestamp is
+    # passed explicitly.
+    return DFR.model_construct(
         plan_hash=plan_hash,
         engine_version=str(ENGINE_VERSION),
         passed=passed,
-        violations=formatted_violations
+        violations=formatted_violations,
+        rule_ids=[v.rule_id for v in violations],
+        timestamp=datetime.utcnow(),
     )
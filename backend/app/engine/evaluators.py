@@ -3,7 +3,6 @@ from typing import List, Dict, Any, Protocol
 from dataclasses import dataclass
 import hashlib
 from app.engine.graph import SystemGraph
-from app.core.canonicalize import canonicalize_json
 
 @dataclass
 class Violation:
@@ -17,18 +16,31 @@ class RuleEvaluator(Protocol):
     def evaluate(self, graph: SystemGraph) -> List[Violation]:
         ...
 
+def _hash_violation(rule_id: str, offending_node: str, dedup_data: Dict[str, Any]) -> str:
+    """
+    Deterministic violation hash from a length-delimited byte tuple:
+    sha256(rule_id \\0 offending_node \\0 k=repr(v) \\0 ...) with keys
+    sorted. Same determinism as JSON-canonicalizing the payload, without
+    a serializer invocation per violation. Changing this scheme changes
+    hashes, which is fine — ENGINE_VERSION covers evaluators.py and
+    rotates with it.
+
+    This is a dedup key, not a security primitive: blake2b beats sha256
+    on small inputs and 16 bytes is plenty of collision margin within a
+    single DFR. The plan hash in generate_dfr stays sha256 for audit
+    stability.
+    """
+    parts = [rule_id.encode(), b'\0', offending_node.encode(), b'\0']
+    for k in sorted(dedup_data):
+        parts.append(k.encode() + b'=' + repr(dedup_data[k]).encode() + b'\0')
+    return hashlib.blake2b(b''.join(parts), digest_size=16).hexdigest()
+
 def generate_violation(rule_id: str, message: str, offending_node: str, dedup_data: Dict[str, Any]) -> Violation:
     """
     Helper to generate deterministic violation with hash ID.
     """
-    # Deterministic ID generation: sha256(rule_id + offending_node + canonical_details)
-    payload = {
-        "rule_id": rule_id,
-        "offending_node": offending_node,
-        **dedup_data
-    }
-    v_id = hashlib.sha256(canonicalize_json(payload).encode()).hexdigest()
-    
+    v_id = _hash_violation(rule_id, offending_node, dedup_data)
+
     return Violation(
         rule_id=rule_id,
         message=f"{message} (ID: {v_id[:8]})",
@@ -46,31 +58,24 @@ class FeBeMatchEvaluator:
             if edge.type == "calls":
                 source_node = graph.get_node(edge.source)
                 target_node = graph.get_node(edge.target)
-                
+
                 # Check if source is Frontend
-                is_frontend = False
-                if source_node.type == 'component':
-                     is_frontend = source_node.properties.get('comp_type') == 'frontend'
-                
+                is_frontend = source_node.type == 'component' and source_node.comp_type == 'frontend'
+
                 if is_frontend:
                     # Frontend API call must exist in backend.
                     # Structural existence is guaranteed by Builder for IDs.
                     # But we must verify the Semantics (Path/Method) match if specified in metadata.
-                    
-                    call_path = edge.metadata.get('path') if edge.metadata else None
+
+                    call_path = edge.call_path
                     if call_path:
                         resolved_node = target_node
                         if target_node.type == 'component':
-                            # Re-resolve (Builder logic)
-                            children_edges = graph.find_outgoing_edges(target_node.id, 'contains')
-                            for e in children_edges:
-                                child = graph.get_node(e.target)
-                                if child.type == 'api_endpoint':
-                                    props = child.properties or {}
-                                    if props.get('path') == call_path:
-                                        resolved_node = child
-                                        break
-                        
+                            # Resolve via the frozen endpoint index
+                            endpoint = graph.resolve_call(target_node.id, call_path)
+                            if endpoint is not None:
+                                resolved_node = endpoint
+
                         # Now check if resolved node is actually in backend
                         # Find parent component of resolved_node
                         parents = graph.find_incoming_edges(resolved_node.id, 'contains')
@@ -78,7 +83,7 @@ class FeBeMatchEvaluator:
                         if parents:
                             parent_id = parents[0].source
                             parent = graph.get_node(parent_id)
-                            if parent.type == 'component' and parent.properties.get('comp_type') == 'backend':
+                            if parent.type == 'component' and parent.comp_type == 'backend':
                                 is_backend_target = True
                         
                         if not is_backend_target:
@@ -99,17 +104,14 @@ class ApiSchemaEvaluator:
         api_nodes = graph.find_nodes_by_type('api_endpoint')
         
         for node in api_nodes:
-            props = node.properties or {}
-            # Check for generic 'schema' property or specific request/response
-            # MVP: "API endpoint must declare schema" -> generic presence check
-            has_schema = 'schema' in props or 'request_schema' in props or 'response_schema' in props
-            
-            if not has_schema:
+            # "API endpoint must declare schema" -> generic presence check,
+            # stamped onto the node at add time.
+            if not node.has_schema:
                 violations.append(generate_violation(
                     self.rule_id,
-                    f"API Endpoint {node.name} ({props.get('path', 'unknown')}) missing schema declaration.",
+                    f"API Endpoint {node.name} ({node.path or 'unknown'}) missing schema declaration.",
                     node.id,
-                    {"path": props.get('path')}
+                    {"path": node.path}
                 ))
         return violations
 
@@ -147,35 +149,116 @@ class ApiMethodMatchEvaluator:
         edges = graph.edges
         for edge in edges:
             if edge.type == "calls":
-                call_method = edge.metadata.get('method') if edge.metadata else None
-                if call_method:
+                if edge.call_method_upper:
                     target_node = graph.get_node(edge.target)
-                    
+
                     # Resolve if targeting component
-                    if target_node.type == 'component':
-                        call_path = edge.metadata.get('path')
-                        children_edges = graph.find_outgoing_edges(target_node.id, 'contains')
-                        for e in children_edges:
-                            child = graph.get_node(e.target)
-                            if child.type == 'api_endpoint' and child.properties.get('path') == call_path:
-                                target_node = child
-                                break
-                    
+                    if target_node.type == 'component' and edge.call_path:
+                        endpoint = graph.resolve_call(target_node.id, edge.call_path)
+                        if endpoint is not None:
+                            target_node = endpoint
+
                     if target_node.type == 'api_endpoint':
-                        target_method = target_node.properties.get('method')
-                        if target_method and target_method.upper() != call_method.upper():
-                             violations.append(generate_violation(
+                        if target_node.method_upper and target_node.method_upper != edge.call_method_upper:
+                            # Originals (pre-upper) preserved in the payload so
+                            # messages and hashes are unchanged.
+                            call_method = edge.metadata.get('method')
+                            target_method = target_node.properties.get('method')
+                            violations.append(generate_violation(
                                 self.rule_id,
                                 f"HTTP Method Mismatch: Call uses {call_method}, Endpoint expects {target_method}.",
                                 edge.source,
-                                {"call_method": call_method, "target_method": target_method, "path": edge.metadata.get('path')}
+                                {"call_method": call_method, "target_method": target_method, "path": edge.call_path}
                             ))
         return violations
 
-# Registry of all active evaluators
-ACTIVE_EVALUATORS = [
+# Registry of all active evaluators (immutable — nothing registers at runtime)
+ACTIVE_EVALUATORS = (
     FeBeMatchEvaluator(),
     ApiSchemaEvaluator(),
     DbMigEvaluator(),
-    ApiMethodMatchEvaluator()
-]
+    ApiMethodMatchEvaluator(),
+)
+
+
+def run_all(graph: SystemGraph) -> List[Violation]:
+    """
+    Fused sweep over the graph: one pass over edges covers FE_BE_001 and
+    API_METHOD_MATCH_001 (sharing a single call resolution per edge), one
+    pass over nodes covers API_SCHEMA_001 and DB_MIG_001. Same rules as
+    iterating ACTIVE_EVALUATORS, but the edge list is traversed once
+    instead of twice and each calls edge resolves its target once.
+    Violation order differs from the sequential run, which is fine:
+    generate_dfr sorts deterministically.
+    """
+    violations: List[Violation] = []
+
+    # ── Edge sweep ──
+    for edge in graph.edges:
+        if edge.type != "calls":
+            continue
+
+        target_node = graph.get_node(edge.target)
+
+        # Resolve component targets once, shared by both edge rules
+        resolved_node = target_node
+        if edge.call_path and target_node.type == 'component':
+            endpoint = graph.resolve_call(target_node.id, edge.call_path)
+            if endpoint is not None:
+                resolved_node = endpoint
+
+        # FE_BE_001: frontend calls must land on a backend API
+        if edge.call_path:
+            source_node = graph.get_node(edge.source)
+            if source_node.type == 'component' and source_node.comp_type == 'frontend':
+                parents = graph.find_incoming_edges(resolved_node.id, 'contains')
+                is_backend_target = False
+                if parents:
+                    parent = graph.get_node(parents[0].source)
+                    if parent.type == 'component' and parent.comp_type == 'backend':
+                        is_backend_target = True
+
+                if not is_backend_target:
+                    violations.append(generate_violation(
+                        FeBeMatchEvaluator.rule_id,
+                        f"Frontend calls {edge.call_path} which is not a Backend API.",
+                        edge.source,
+                        {"target": resolved_node.id, "path": edge.call_path}
+                    ))
+
+        # API_METHOD_MATCH_001: declared call method must match the endpoint
+        if edge.call_method_upper and resolved_node.type == 'api_endpoint':
+            if resolved_node.method_upper and resolved_node.method_upper != edge.call_method_upper:
+                call_method = edge.metadata.get('method')
+                target_method = resolved_node.properties.get('method')
+                violations.append(generate_violation(
+                    ApiMethodMatchEvaluator.rule_id,
+                    f"HTTP Method Mismatch: Call uses {call_method}, Endpoint expects {target_method}.",
+                    edge.source,
+                    {"call_method": call_method, "target_method": target_method, "path": edge.call_path}
+                ))
+
+    # ── Node sweep ──
+    for node in graph.nodes:
+        if node.type == 'api_endpoint':
+            if not node.has_schema:
+                violations.append(generate_violation(
+                    ApiSchemaEvaluator.rule_id,
+                    f"API Endpoint {node.name} ({node.path or 'unknown'}) missing schema declaration.",
+                    node.id,
+                    {"path": node.path}
+                ))
+        elif node.type == 'database_table':
+            incoming = graph.find_incoming_edges(node.id, 'creates')
+            has_migration = any(
+                graph.get_node(edge.source).type == 'migration' for edge in incoming
+            )
+            if not has_migration:
+                violations.append(generate_violation(
+                    DbMigEvaluator.rule_id,
+                    f"Table {node.name} is not created by any migration.",
+                    node.id,
+                    {"table_name": node.name}
+                ))
+
+    return violations
@@ -1,95 +1,173 @@
 
-import networkx as nx
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NodeData:
     id: str
     type: str # 'component', 'api', 'table', etc.
     name: str
     properties: Dict[str, Any] = None
+    # Derived from properties at add time so hot loops read attributes
+    # (interned-string compares) instead of repeating dict gets / .upper().
+    comp_type: Optional[str] = None
+    path: Optional[str] = None
+    method_upper: Optional[str] = None
+    has_schema: bool = False
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EdgeData:
     source: str
     target: str
     type: str
     metadata: Dict[str, Any] = None
+    # Derived from metadata at add time, same rationale as NodeData.
+    call_path: Optional[str] = None
+    call_method_upper: Optional[str] = None
 
 class SystemGraph:
     """
-    Defensive wrapper around NetworkX DiGraph.
-    Represents the architecture as a directed graph of Components, Files, and Resources.
+    Directed multigraph of Components, Files, and Resources backed by
+    plain dict/list adjacency. The engine only ever adds nodes/edges and
+    iterates them, so native containers beat a general graph library:
+    no per-node attribute dicts, no nested multi-edge keying, and edge
+    traversal is a straight list walk.
+
+    freeze() precomputes node/edge views so evaluator traversals read
+    cached lists instead of filtering adjacency on every accessor call.
     """
     def __init__(self):
-        self._graph = nx.MultiDiGraph()
         self._frozen = False
+        self._node_map: Dict[str, NodeData] = {}
+        self._edges_list: List[EdgeData] = []
+        self._out_adj: Dict[str, List[EdgeData]] = defaultdict(list)
+        self._in_adj: Dict[str, List[EdgeData]] = defaultdict(list)
+        # Populated by freeze()
+        self._nodes_by_type: Dict[str, List[NodeData]] = {}
+        # Buckets keyed (node_id, edge_type); (node_id, None) holds all edges
+        self._out_buckets: Dict[tuple, List[EdgeData]] = {}
+        self._in_buckets: Dict[tuple, List[EdgeData]] = {}
+        # Endpoint lookup tables, keyed by the owning component
+        self._endpoint_index: Dict[tuple, NodeData] = {}          # (component_id, path, METHOD)
+        self._endpoints_by_parent_path: Dict[tuple, List[NodeData]] = {}  # (component_id, path)
 
-    def add_node(self, id: str, type: str, name: str, **kwargs):
+    def add_node(self, id: str, type: str, name: str, properties: Optional[Dict[str, Any]] = None):
         if self._frozen:
             raise RuntimeError("Graph is frozen")
-        self._graph.add_node(id, type=type, name=name, **kwargs)
+        props = properties or {}
+        method = props.get('method')
+        self._node_map[id] = NodeData(
+            id=id, type=type, name=name, properties=properties,
+            comp_type=props.get('comp_type'),
+            path=props.get('path'),
+            method_upper=method.upper() if method else None,
+            has_schema='schema' in props or 'request_schema' in props or 'response_schema' in props,
+        )
 
-    def add_edge(self, source: str, target: str, type: str, **kwargs):
+    def add_edge(self, source: str, target: str, type: str, metadata: Optional[Dict[str, Any]] = None):
         if self._frozen:
             raise RuntimeError("Graph is frozen")
-        if not self._graph.has_node(source):
+        if source not in self._node_map:
             raise ValueError(f"Source node {source} does not exist")
-        if not self._graph.has_node(target):
+        if target not in self._node_map:
             raise ValueError(f"Target node {target} does not exist")
-        
-        self._graph.add_edge(source, target, type=type, **kwargs)
+
+        md = metadata or {}
+        call_method = md.get('method')
+        edge = EdgeData(
+            source=source, target=target, type=type, metadata=metadata,
+            call_path=md.get('path'),
+            call_method_upper=call_method.upper() if call_method else None,
+        )
+        self._edges_list.append(edge)
+        self._out_adj[source].append(edge)
+        self._in_adj[target].append(edge)
 
     def freeze(self):
+        if self._frozen:
+            return
         self._frozen = True
-        # NetworkX freeze is actually nx.freeze(G), which makes it immutable
-        nx.freeze(self._graph)
+
+        # One pass over nodes, one over edges; every accessor below serves
+        # from these caches once frozen.
+        nodes_by_type = defaultdict(list)
+        for node in self._node_map.values():
+            nodes_by_type[node.type].append(node)
+        self._nodes_by_type = dict(nodes_by_type)
+
+        out_buckets = defaultdict(list)
+        in_buckets = defaultdict(list)
+        for edge in self._edges_list:
+            out_buckets[(edge.source, edge.type)].append(edge)
+            out_buckets[(edge.source, None)].append(edge)
+            in_buckets[(edge.target, edge.type)].append(edge)
+            in_buckets[(edge.target, None)].append(edge)
+        self._out_buckets = dict(out_buckets)
+        self._in_buckets = dict(in_buckets)
+
+        # Index API endpoints by owning component so call resolution is a
+        # dict hit instead of a scan over 'contains' children.
+        for node in self._nodes_by_type.get('api_endpoint', []):
+            if not node.path:
+                continue
+            for parent_edge in self._in_buckets.get((node.id, 'contains'), []):
+                key = (parent_edge.source, node.path)
+                self._endpoints_by_parent_path.setdefault(key, []).append(node)
+                if node.method_upper:
+                    self._endpoint_index[(parent_edge.source, node.path, node.method_upper)] = node
 
     # --- Accessors ---
 
     @property
     def nodes(self) -> List[NodeData]:
-        return [
-            NodeData(id=n, **self._graph.nodes[n]) 
-            for n in self._graph.nodes
-        ]
+        return list(self._node_map.values())
 
     @property
     def edges(self) -> List[EdgeData]:
-        return [
-            EdgeData(source=u, target=v, **data)
-            for u, v, data in self._graph.edges(data=True)
-        ]
+        return self._edges_list
 
     def get_node(self, node_id: str) -> Optional[NodeData]:
-        if not self._graph.has_node(node_id):
-            return None
-        return NodeData(id=node_id, **self._graph.nodes[node_id])
+        return self._node_map.get(node_id)
 
     def find_nodes_by_type(self, type: str) -> List[NodeData]:
-        # Filter nodes by type attribute
-        nodes = []
-        for n, data in self._graph.nodes(data=True):
-            if data.get('type') == type:
-                nodes.append(NodeData(id=n, **data))
-        return nodes
+        if self._frozen:
+            return self._nodes_by_type.get(type, [])
+        return [node for node in self._node_map.values() if node.type == type]
 
     def find_incoming_edges(self, node_id: str, edge_type: Optional[str] = None) -> List[EdgeData]:
-        edges = []
-        if self._graph.has_node(node_id):
-            for u, v, data in self._graph.in_edges(node_id, data=True):
-                if edge_type is None or data.get('type') == edge_type:
-                    edges.append(EdgeData(source=u, target=v, **data))
-        return edges
+        if self._frozen:
+            return self._in_buckets.get((node_id, edge_type), [])
+        edges = self._in_adj.get(node_id, [])
+        if edge_type is None:
+            return list(edges)
+        return [edge for edge in edges if edge.type == edge_type]
 
     def find_outgoing_edges(self, node_id: str, edge_type: Optional[str] = None) -> List[EdgeData]:
-        edges = []
-        if self._graph.has_node(node_id):
-            for u, v, data in self._graph.out_edges(node_id, data=True):
-                if edge_type is None or data.get('type') == edge_type:
-                    edges.append(EdgeData(source=u, target=v, **data))
-        return edges
+        if self._frozen:
+            return self._out_buckets.get((node_id, edge_type), [])
+        edges = self._out_adj.get(node_id, [])
+        if edge_type is None:
+            return list(edges)
+        return [edge for edge in edges if edge.type == edge_type]
+
+    def resolve_call(self, component_id: str, path: str, method: Optional[str] = None) -> Optional[NodeData]:
+        """
+        Resolve a call against the endpoints a component contains.
+        With a method, an exact (path, method) endpoint wins; otherwise —
+        and as fallback — the first endpoint declared at that path.
+        Only meaningful after freeze().
+        """
+        if method:
+            node = self._endpoint_index.get((component_id, path, method.upper()))
+            if node is not None:
+                return node
+        matches = self._endpoints_by_parent_path.get((component_id, path))
+        return matches[0] if matches else None
+
+    def list_endpoints_at(self, component_id: str, path: str) -> List[NodeData]:
+        """All endpoints a component declares at a path. Only meaningful after freeze()."""
+        return self._endpoints_by_parent_path.get((component_id, path), [])
 
     def find_matching_endpoints(self, path_pattern: str, method: str = None) -> List[NodeData]:
         """
@@ -103,7 +181,7 @@ class SystemGraph:
             props = node.properties or {}
             node_path = props.get('path')
             node_method = props.get('method')
-            
+
             # Use simple string matching for MVP
             if node_path == path_pattern:
                 if method:
@@ -1,39 +1,98 @@
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
+import os
+import queue
+import sys
 import uuid
 import logging
-import json
+import logging.handlers
+import orjson
 import time
 
 from app.core.config import settings
 
 # Database Setup - MUST be before route imports to avoid circular imports
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",        # readers don't block the writer
+    "PRAGMA synchronous=NORMAL",      # fsync per checkpoint, not per commit
+    "PRAGMA cache_size=-65536",       # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",     # 256 MiB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",       # wait instead of 'database is locked'
 )
+
+if "sqlite" in settings.DATABASE_URL:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+else:
+    # Server databases: size the pool for the threadpool-backed routes so
+    # bursts don't serialize on connection checkout. Sessions stay
+    # synchronous — the ORM layer throughout the app is sync and the dev
+    # default is SQLite, which has no async driver in our stack.
+    engine = create_engine(
+        settings.DATABASE_URL,
+        pool_size=20,
+        max_overflow=40,
+        pool_pre_ping=True,   # don't hand out connections the server dropped
+        pool_recycle=3600,
+    )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Import models and create tables
+# Import models; table creation is dev/test-only — in production the
+# schema is Alembic-managed and every worker re-running create_all's
+# introspection at import is wasted startup time.
 from app.db.models import Base
-Base.metadata.create_all(bind=engine)
+if settings.AUTO_CREATE_TABLES:
+    Base.metadata.create_all(bind=engine)
 
 # NOW import routes (after SessionLocal is defined)
 from app.api.routes import auth, byok, validation, agent, health
+from app.core.audit import start_audit_worker
 from app.core.metrics import PrometheusMiddleware, metrics_endpoint
 
 # Setup structured logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("governance_engine")
 
+# Access logs go through a queue so the request path only pays for an
+# enqueue; the listener thread (daemon, started at import like the rest
+# of this module's setup) does the stdout write and flush off-path.
+_access_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_access_logger = logging.getLogger("governance_engine.access")
+_access_logger.propagate = False
+_access_logger.addHandler(logging.handlers.QueueHandler(_access_log_queue))
+_access_stdout = logging.StreamHandler(sys.stdout)
+_access_stdout.setFormatter(logging.Formatter("%(message)s"))
+logging.handlers.QueueListener(_access_log_queue, _access_stdout).start()
+
+# Header debugging is opt-in; building the redacted dict per request is
+# wasted work when the field is not even emitted.
+_LOG_HEADERS = bool(os.getenv("DEBUG_LOG_HEADERS"))
+_REDACT_HEADERS = frozenset({"x-gemini-key", "authorization"})
+# High-frequency probe endpoints (k8s liveness/readiness, scrapers):
+# middleware work is pure overhead there and dominates the handler.
+_FAST_PATHS = frozenset({"/health/live", "/health/ready", "/metrics"})
+
 class RequestIDMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
+        if request.url.path in _FAST_PATHS:
+            return await call_next(request)
         request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
         request.state.request_id = request_id
         response = await call_next(request)
@@ -53,28 +112,33 @@ class LogRedactionMiddleware(BaseHTTPMiddleware):
         # Standard uvicorn logs don't show headers by default.
         # We will add a structured log entry here that explicitly EXCLUDES the key.
         
+        path = request.url.path
+        if path in _FAST_PATHS:
+            return await call_next(request)
+
         start_time = time.time()
         response = await call_next(request)
         process_time = time.time() - start_time
-        
-        log_exclude = {"x-gemini-key", "authorization"}
-        safe_headers = {k: v for k, v in request.headers.items() if k.lower() not in log_exclude}
-        
+
         log_entry = {
             "timestamp": time.time(),
             "request_id": getattr(request.state, "request_id", None),
             "method": request.method,
-            "path": request.url.path,
+            "path": path,
             "status_code": response.status_code,
             "duration": process_time,
             "ip": getattr(request.client, "host", "unknown") if request.client else "unknown",
             "user_agent": request.headers.get("user-agent"),
-            # "headers": safe_headers # Uncomment if we need header debugging
         }
-        
-        # Structured Log
-        print(json.dumps(log_entry))
-        
+        if _LOG_HEADERS:
+            log_entry["headers"] = {
+                k: v for k, v in request.headers.items()
+                if k.lower() not in _REDACT_HEADERS
+            }
+
+        # Structured Log: orjson in the request path, I/O on the listener thread
+        _access_logger.info(orjson.dumps(log_entry).decode())
+
         return response
 
 app = FastAPI(
@@ -83,6 +147,9 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    # orjson serializes response bodies in C — the stdlib encoder was a
+    # measurable cost for large DFR / suggestion payloads
+    default_response_class=ORJSONResponse,
 )
 
 # CORS - Must be FIRST to wrap all responses properly
@@ -107,14 +174,9 @@ app.add_middleware(PrometheusMiddleware)
 
 app.add_route("/metrics", metrics_endpoint)
 
-@app.get("/health/live")
-def health_live():
-    return {"status": "alive"}
-
-@app.get("/health/ready")
-def health_ready():
-    # In a real app, check DB connection here
-    return {"status": "ready"}
+@app.on_event("startup")
+async def _start_background_workers():
+    start_audit_worker()
 
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
@@ -127,9 +189,10 @@ app.include_router(agent.router, prefix="/api/agent", tags=["agent"])
 @app.api_route("/.netlify/functions/api", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD", "PATCH"])
 @app.api_route("/{path_name:path}", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD", "PATCH"])
 async def catch_all(request: Request, path_name: str = ""):
-    return {
-        "detail": f"Debug: received_path={path_name}, method={request.method}, base_url={request.base_url}, url={request.url}"
-    }
+    # Static body: this route matches every unknown path (bot scans
+    # included), so no scope stringification and no reflecting the
+    # requested URL back into the response or logs.
+    return ORJSONResponse({"detail": "not found"}, status_code=404)
 
 if __name__ == "__main__":
     import uvicorn
@@ -7,19 +7,22 @@ from pathlib import Path
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.db.schemas import PlanSchema
-from app.engine.builder import Builder, BuildError
-from app.engine.evaluators import ACTIVE_EVALUATORS
-from app.engine.dfr import generate_dfr
-from app.core.engine_version import ENGINE_VERSION
-
 def main():
     parser = argparse.ArgumentParser(description="Deterministic Architecture Validator")
     parser.add_argument("plan_file", help="Path to input plan JSON file")
     parser.add_argument("--json", action="store_true", help="Output only JSON DFR", default=True)
-    
+
     args = parser.parse_args()
-    
+
+    # Deferred: pulls in pydantic schemas, sqlalchemy-backed config and the
+    # engine — none of which --help or an argparse error should pay for.
+    import orjson
+    from app.db.schemas import PlanSchema
+    from app.engine.builder import Builder, BuildError
+    from app.engine.evaluators import run_all
+    from app.engine.dfr import generate_dfr
+    from app.core.engine_version import ENGINE_VERSION
+
     try:
         # 1. Load Plan
         plan_path = Path(args.plan_file)
@@ -42,25 +45,25 @@ def main():
         try:
             graph = builder.build(plan)
         except BuildError as e:
-            print(json.dumps({
+            sys.stdout.buffer.write(orjson.dumps({
                 "error": "BuildError",
                 "detail": str(e),
                 "engine_version": str(ENGINE_VERSION)
-            }, indent=2))
+            }, option=orjson.OPT_INDENT_2) + b'\n')
             sys.exit(1)
 
-        # 3. Evaluate
-        violations = []
-        for evaluator in ACTIVE_EVALUATORS:
-            violations.extend(evaluator.evaluate(graph))
+        # 3. Evaluate (single fused sweep)
+        violations = run_all(graph)
 
         # 4. Generate DFR
         dfr = generate_dfr(plan, violations)
         # Inject current engine version
         dfr.engine_version = str(ENGINE_VERSION) # from module
 
-        # 5. Output
-        print(dfr.model_dump_json(indent=2))
+        # 5. Output — orjson writes bytes straight to stdout; Pydantic's
+        # JSON encoder with indentation is the slow path for large DFRs.
+        sys.stdout.buffer.write(orjson.dumps(dfr.model_dump(mode='python'), option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b'\n')
         
         # 6. Exit Code
         sys.exit(0 if dfr.passed else 1)
@@ -2,6 +2,7 @@
 import sys
 import os
 import unittest
+from itertools import chain
 from typing import List
 
 # Ensure app is in path
@@ -11,26 +12,25 @@ from app.db.schemas import PlanSchema, Component, Resource, Relationship
 from app.engine.builder import Builder, BuildError
 from app.engine.evaluators import ACTIVE_EVALUATORS
 
-class TestDFRStrict(unittest.TestCase):
-    
-    def test_strict_domain_rejection(self):
-        """Builder should reject unknown component types."""
-        plan = PlanSchema(
+# Table of strict cases: each entry is (name, plan, expectation) where the
+# expectation is either {"error": <BuildError substring>} or
+# {"rules": [<rule ids the evaluators must emit>]}.
+CASES = [
+    (
+        "strict_domain_rejection",
+        PlanSchema(
             schema_version="1.0",
             project_name="Invalid Type Plan",
             components=[
                 Component(id="c1", name="Worker", type="worker", path="/")
             ],
             relationships=[]
-        )
-        builder = Builder()
-        with self.assertRaises(BuildError) as cm:
-            builder.build(plan)
-        self.assertIn("Unknown component type", str(cm.exception))
-
-    def test_structural_unique_endpoint(self):
-        """Builder should reject duplicate API endpoints (Method+Path)."""
-        plan = PlanSchema(
+        ),
+        {"error": "Unknown component type"},
+    ),
+    (
+        "structural_unique_endpoint",
+        PlanSchema(
             schema_version="1.0",
             project_name="Duplicate Route Plan",
             components=[
@@ -40,15 +40,13 @@ class TestDFRStrict(unittest.TestCase):
                 ])
             ],
             relationships=[]
-        )
-        builder = Builder()
-        with self.assertRaises(BuildError) as cm:
-            builder.build(plan)
-        self.assertIn("UNIQUE_ENDPOINT", str(cm.exception))
-
-    def test_ambiguous_call(self):
-        """Builder should reject ambiguous calls (Path matches multiple methods, call has no method)."""
-        plan = PlanSchema(
+        ),
+        {"error": "UNIQUE_ENDPOINT"},
+    ),
+    (
+        # Path matches multiple methods and the call has no method
+        "ambiguous_call",
+        PlanSchema(
             schema_version="1.0",
             project_name="Ambiguous Call Plan",
             components=[
@@ -61,15 +59,12 @@ class TestDFRStrict(unittest.TestCase):
             relationships=[
                 Relationship(source="fe", target="be", type="calls", metadata={"path": "/users"}) # No method specified
             ]
-        )
-        builder = Builder()
-        with self.assertRaises(BuildError) as cm:
-            builder.build(plan)
-        self.assertIn("NO_AMBIGUOUS_ROUTE", str(cm.exception))
-
-    def test_architectural_violations(self):
-        """Evaluators should detect architectural issues."""
-        plan = PlanSchema(
+        ),
+        {"error": "NO_AMBIGUOUS_ROUTE"},
+    ),
+    (
+        "architectural_violations",
+        PlanSchema(
             schema_version="1.0",
             project_name="Violation Plan",
             components=[
@@ -82,36 +77,44 @@ class TestDFRStrict(unittest.TestCase):
                 Component(id="db", name="DB", type="database", path="/db", resources=[
                     Resource(id="tbl1", type="database_table", name="Users", properties={}), # Missing Migration
                 ]),
-                # Component(id="mig", name="Mig", type="backend", path="/mig", resources=[
-                #     Resource(id="m1", type="migration", name="Init", properties={})
-                # ])
             ],
             relationships=[
                 # FE_BE_001 Violation: Call non-existent path
                 Relationship(source="fe", target="be", type="calls", metadata={"path": "/missing", "method": "GET"}),
-                
+
                 # API_METHOD_MATCH_001 Violation: Call with wrong method
                 Relationship(source="fe", target="be", type="calls", metadata={"path": "/method", "method": "GET"}), # Target is POST
             ]
-        )
-        
-        builder = Builder()
-        graph = builder.build(plan)
-        
-        violations = []
-        for evaluator in ACTIVE_EVALUATORS:
-            violations.extend(evaluator.evaluate(graph))
-            
-        # Debug print
-        # for v in violations:
-        #     print(f"{v.rule_id}: {v.message}")
-            
-        rule_ids = [v.rule_id for v in violations]
-        
-        self.assertIn("FE_BE_001", rule_ids)
-        self.assertIn("API_SCHEMA_001", rule_ids)
-        self.assertIn("DB_MIG_001", rule_ids)
-        self.assertIn("API_METHOD_MATCH_001", rule_ids)
+        ),
+        {"rules": frozenset({"FE_BE_001", "API_SCHEMA_001", "DB_MIG_001", "API_METHOD_MATCH_001"})},
+    ),
+]
+
+class TestDFRStrict(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Builder is stateless across builds — one instance serves every case.
+        cls.builder = Builder()
+
+    def test_strict_cases(self):
+        for name, plan, expect in CASES:
+            with self.subTest(case=name):
+                if "error" in expect:
+                    with self.assertRaises(BuildError) as cm:
+                        self.builder.build(plan)
+                    self.assertIn(expect["error"], str(cm.exception))
+                else:
+                    graph = self.builder.build(plan)
+                    violations = list(chain.from_iterable(
+                        evaluator.evaluate(graph) for evaluator in ACTIVE_EVALUATORS
+                    ))
+                    rule_ids = {v.rule_id for v in violations}
+                    # One C-level subset check instead of per-rule assertIn
+                    self.assertTrue(
+                        expect["rules"].issubset(rule_ids),
+                        f"missing rules: {expect['rules'] - rule_ids}",
+                    )
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,54 @@
+"""
+pytest-benchmark harness for the /validate endpoint.
+
+Runs the same ten scenarios as hardcore_validation_tests.py against a
+live server and records per-call latency distributions. Kept out of the
+backend unit suite on purpose — run it as its own job so the benchmarks
+don't share runner variance with unit tests:
+
+    pytest tests/perf --benchmark-save=baseline
+    pytest tests/perf --benchmark-compare --benchmark-compare-fail=mean:10%
+
+The compare-fail flag turns a >10% mean regression into a test failure.
+"""
+import sys
+from pathlib import Path
+
+import httpx
+import orjson
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from hardcore_validation_tests import BASE_URL, EMAIL, PASSWORD, build_specs
+
+SPECS = build_specs()
+
+
+@pytest.fixture(scope="session")
+def client():
+    c = httpx.Client(base_url=BASE_URL, timeout=30.0)
+    try:
+        resp = c.post("/auth/token", data={"username": EMAIL, "password": PASSWORD})
+    except httpx.ConnectError:
+        pytest.skip("benchmark harness needs a live server on localhost:8000")
+    if resp.status_code != 200:
+        pytest.skip("benchmark harness needs the seeded test account (run the hardcore suite first)")
+    c.headers["Authorization"] = f"Bearer {resp.json()['access_token']}"
+    yield c
+    c.close()
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=[s.name for s in SPECS])
+def test_validate_bench(benchmark, client, spec):
+    body = orjson.dumps(spec.payload)
+
+    def call():
+        # /api/validate/ with the trailing slash — the slash-less path is
+        # swallowed by the app's catch-all route and 404s.
+        response = client.post("/validate/", content=body,
+                               headers={"content-type": "application/json"})
+        assert response.status_code == spec.expected_status
+        return response
+
+    benchmark(call)